@@ -1,67 +1,128 @@
-#Конфигурация приложения LottoMeteoStats
-
-import os
-from dotenv import load_dotenv
-
-# Создаем папку data если ее нет
-if not os.path.exists('data'):
-    os.makedirs('data')
-
-
-# Загружаем переменные окружения из .env файла
-load_dotenv()
-
-class Config:
-    """Базовые настройки приложения"""
-    
-    # Безопасность
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    
-    # Путь к БД в папке data (База данных)
-    basedir = os.path.abspath(os.path.dirname(__file__))
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'data', 'lottery.db') # Путь к БД
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
-    # API ключи
-    WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')
-    WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
-    
-    # Настройки лотереи
-    LOTTERY_URL = os.getenv('LOTTERY_URL', '')
-    LOTTERY_NAME = os.getenv('LOTTERY_NAME', 'RussianLotto')
-    
-    # Город для погоды
-    CITY_NAME = os.getenv('CITY_NAME', 'Moscow')
-    COUNTRY_CODE = os.getenv('COUNTRY_CODE', 'RU')
-    
-    # Настройки приложения
-    DEBUG = os.getenv('FLASK_ENV') == 'development'
-    UPDATE_INTERVAL_HOURS = int(os.getenv('UPDATE_INTERVAL_HOURS', '24'))
-    
-    # Пути к файлам
-    DATA_DIR = 'data'
-    CACHE_DIR = os.path.join(DATA_DIR, 'cache')
-    EXPORTS_DIR = os.path.join(DATA_DIR, 'exports')
-    
-    # Создаем необходимые директории
-    @staticmethod
-    def create_directories():
-        """Создает необходимые директории для работы приложения"""
-        directories = [
-            Config.DATA_DIR,
-            Config.CACHE_DIR,
-            Config.EXPORTS_DIR
-        ]
-        
-        for directory in directories:
-            if not os.path.exists(directory):
-                os.makedirs(directory)
-                print(f"Создана директория: {directory}")
-
-# Создаем директории при импорте конфигурации
-Config.create_directories()
-
-# Погодные настройки
-WEATHER_API_BASE_URL = "https://api.openweathermap.org/data/2.5"
-WEATHER_CURRENT_URL = f"{WEATHER_API_BASE_URL}/weather"
+#Конфигурация приложения LottoMeteoStats
+
+import os
+from dotenv import load_dotenv
+
+# Создаем папку data если ее нет
+if not os.path.exists('data'):
+    os.makedirs('data')
+
+
+# Загружаем переменные окружения из .env файла
+load_dotenv()
+
+class Config:
+    """Базовые настройки приложения"""
+    
+    # Безопасность
+    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    
+    # Путь к БД в папке data (База данных)
+    basedir = os.path.abspath(os.path.dirname(__file__))
+    DATABASE_PATH = os.getenv('DATABASE_PATH', os.path.join(basedir, 'data', 'lottery.db'))
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + DATABASE_PATH # Путь к БД
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Настройки соединений SQLite (применяются один раз на соединение из пула)
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '8'))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '30'))
+    SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', '256'))
+    
+    # API ключи
+    WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')
+    WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
+    
+    # Настройки лотереи
+    LOTTERY_URL = os.getenv('LOTTERY_URL', '')
+    LOTTERY_NAME = os.getenv('LOTTERY_NAME', 'RussianLotto')
+    
+    # Город для погоды
+    CITY_NAME = os.getenv('CITY_NAME', 'Moscow')
+    COUNTRY_CODE = os.getenv('COUNTRY_CODE', 'RU')
+    
+    # Часовой пояс, в котором записаны даты тиражей и время замеров погоды
+    TIMEZONE = os.getenv('TIMEZONE', 'Europe/Moscow')
+    
+    # Максимальный разрыв между тиражом и ближайшим замером погоды, минуты
+    WEATHER_ATTRIBUTION_TOLERANCE_MIN = int(os.getenv('WEATHER_ATTRIBUTION_TOLERANCE_MIN', '60'))
+    
+    # Постраничная выдача /api/lottery/data (limit по умолчанию и максимум)
+    LOTTERY_PAGE_SIZE = int(os.getenv('LOTTERY_PAGE_SIZE', '100'))
+    LOTTERY_PAGE_MAX = int(os.getenv('LOTTERY_PAGE_MAX', '1000'))
+    
+    # Размер пачки строк потоковой выгрузки /api/lottery/export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+    
+    # Прогноз Felix Pila - по последним N подходящим тиражам (параметр latest, 0 - все)
+    FELIX_PILA_LATEST_DRAWS = int(os.getenv('FELIX_PILA_LATEST_DRAWS', '100'))
+    
+    # Максимум наборов фильтров в одном POST /api/felix-pila/batch
+    FELIX_PILA_BATCH_MAX = int(os.getenv('FELIX_PILA_BATCH_MAX', '64'))
+    
+    # Кэш JSON-ответов аналитики (записей LRU, сбрасывается с data_version)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))
+    
+    # Предел размера дискового кэша аналитики в CACHE_DIR, МБ
+    CACHE_MAX_MB = int(os.getenv('CACHE_MAX_MB', '256'))
+    
+    # Сколько самых частых запросов пересчитывать при прогреве после сбора
+    WARM_UP_POPULAR = int(os.getenv('WARM_UP_POPULAR', '20'))
+    
+    # Браузер парсера: контекстов в пуле, сборов на контекст, таймаут сбора (сек)
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+    BROWSER_CONTEXT_MAX_USES = int(os.getenv('BROWSER_CONTEXT_MAX_USES', '20'))
+    BROWSER_RUN_TIMEOUT = float(os.getenv('BROWSER_RUN_TIMEOUT', '180'))
+    
+    # Страница архива: таймауты загрузки и ожидания строк тиражей (мс),
+    # типы ресурсов и адреса (подстроки), которые парсер не загружает
+    SCRAPER_GOTO_TIMEOUT_MS = int(os.getenv('SCRAPER_GOTO_TIMEOUT_MS', '30000'))
+    SCRAPER_ROWS_TIMEOUT_MS = int(os.getenv('SCRAPER_ROWS_TIMEOUT_MS', '15000'))
+    SCRAPER_BLOCKED_RESOURCES = os.getenv('SCRAPER_BLOCKED_RESOURCES', 'image,media,font,stylesheet').split(',')
+    SCRAPER_BLOCKED_URLS = os.getenv(
+        'SCRAPER_BLOCKED_URLS',
+        'google-analytics.com,googletagmanager.com,mc.yandex.ru,an.yandex.ru,doubleclick.net,adfox.ru,adriver.ru'
+    ).split(',')
+    
+    # Разбор страницы в браузере: rows - один проход по строкам архива,
+    # legacy - прежний разбор всех похожих на тираж элементов
+    SCRAPER_EXTRACT_MODE = os.getenv('SCRAPER_EXTRACT_MODE', 'rows')
+    
+    # Бэкенд парсера лотереи: http - HTML + BeautifulSoup (браузер, только если
+    # в HTML нет тиражей), browser - всегда Playwright; таймаут HTTP (сек)
+    LOTTERY_PARSER_BACKEND = os.getenv('LOTTERY_PARSER_BACKEND', 'http')
+    SCRAPER_HTTP_TIMEOUT = float(os.getenv('SCRAPER_HTTP_TIMEOUT', '15'))
+    
+    # Настройки приложения
+    DEBUG = os.getenv('FLASK_ENV') == 'development'
+    UPDATE_INTERVAL_HOURS = int(os.getenv('UPDATE_INTERVAL_HOURS', '24'))
+    
+    # Пути к файлам
+    DATA_DIR = 'data'
+    CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+    EXPORTS_DIR = os.path.join(DATA_DIR, 'exports')
+    
+    # Создаем необходимые директории
+    @staticmethod
+    def create_directories():
+        """Создает необходимые директории для работы приложения"""
+        directories = [
+            Config.DATA_DIR,
+            Config.CACHE_DIR,
+            Config.EXPORTS_DIR
+        ]
+        
+        for directory in directories:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+                print(f"Создана директория: {directory}")
+
+# Создаем директории при импорте конфигурации
+Config.create_directories()
+
+# Погодные настройки
+WEATHER_API_BASE_URL = "https://api.openweathermap.org/data/2.5"
+WEATHER_CURRENT_URL = f"{WEATHER_API_BASE_URL}/weather"
 WEATHER_FORECAST_URL = f"{WEATHER_API_BASE_URL}/forecast"
\ No newline at end of file
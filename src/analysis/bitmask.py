@@ -0,0 +1,126 @@
+"""
+Битовые маски полей лотереи 4x20
+
+Поле из 4 чисел от 1 до 20 кодируется 20-битным целым: число n -> бит (n - 1).
+Частоты, совместные выпадения, поиск тиражей с набором чисел и подсчет
+совпадений билета сводятся к побитовому AND и popcount над массивом uint32.
+"""
+
+import numpy as np
+
+NUMBERS_COUNT = 20
+NUMBERS = np.arange(1, NUMBERS_COUNT + 1)
+_SHIFTS = np.arange(NUMBERS_COUNT, dtype=np.uint32)
+
+
+def numbers_to_mask(numbers):
+    """[1, 5, 20] -> 0b10000000000000010001"""
+    mask = 0
+    for number in numbers:
+        number = int(number)
+        if 1 <= number <= NUMBERS_COUNT:
+            mask |= 1 << (number - 1)
+    return mask
+
+
+def mask_to_numbers(mask):
+    """Обратное преобразование: маска -> отсортированный список чисел"""
+    mask = int(mask)
+    return [n for n in range(1, NUMBERS_COUNT + 1) if mask & (1 << (n - 1))]
+
+
+def popcount(masks):
+    """Количество установленных бит в каждом элементе массива"""
+    return np.bitwise_count(np.asarray(masks, dtype=np.uint32))
+
+
+def masks_to_bits(masks):
+    """Массив масок (N,) -> булева матрица (N, 20), столбец i - число i + 1"""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return ((masks[:, None] >> _SHIFTS) & 1).astype(bool)
+
+
+class MaskIndex:
+    """Маски обоих полей всех тиражей и векторные запросы по ним"""
+
+    def __init__(self, field_1_masks, field_2_masks):
+        self.field_1 = np.asarray(field_1_masks, dtype=np.uint32)
+        self.field_2 = np.asarray(field_2_masks, dtype=np.uint32)
+        self._bits = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Из строк (field_1_mask, field_2_mask), например курсора SQLite"""
+        pairs = np.array([(row[0], row[1]) for row in rows], dtype=np.uint32).reshape(-1, 2)
+        return cls(pairs[:, 0], pairs[:, 1])
+
+    def __len__(self):
+        return len(self.field_1)
+
+    def masks(self, field=None):
+        """Маски поля 1, поля 2 или объединение обоих полей (field=None)"""
+        if field == 1:
+            return self.field_1
+        if field == 2:
+            return self.field_2
+        return self.field_1 | self.field_2
+
+    def bits(self, field):
+        """Булева матрица (N, 20) для поля 1 или 2 (кэшируется)"""
+        if field not in self._bits:
+            self._bits[field] = masks_to_bits(self.masks(field))
+        return self._bits[field]
+
+    def frequency(self, field=None):
+        """Сколько раз выпало каждое число 1..20 (индекс 0 - число 1).
+
+        Без поля считаются оба поля: число в обоих полях тиража дает 2.
+        """
+        if field is None:
+            return self.frequency(1) + self.frequency(2)
+        return self.bits(field).sum(axis=0, dtype=np.int64)
+
+    def cooccurrence(self, field=None, other_field=None):
+        """Матрица 20x20 совместных выпадений пар чисел.
+
+        cooccurrence(1) - пары внутри поля 1, cooccurrence(1, 2) - число из
+        поля 1 и число из поля 2 в одном тираже, cooccurrence() - пары внутри
+        одного поля по обоим полям.
+        """
+        if field is None:
+            return self.cooccurrence(1) + self.cooccurrence(2)
+        left = self.bits(field).astype(np.int64)
+        right = self.bits(other_field or field).astype(np.int64)
+        return left.T @ right
+
+    def triples(self, field=None):
+        """Тензор 20x20x20 совместных выпадений троек чисел внутри поля.
+
+        triples[i, j, k] - в скольких тиражах вместе выпали i + 1, j + 1, k + 1:
+        по слою на каждое число i - матричное произведение тиражей с этим числом.
+        """
+        if field is None:
+            return self.triples(1) + self.triples(2)
+        bits = self.bits(field).astype(np.int64)
+        return np.stack([(bits * bits[:, [i]]).T @ bits for i in range(NUMBERS_COUNT)])
+
+    def contains(self, numbers, field=None):
+        """Булев массив: в каких тиражах есть ВСЕ числа набора"""
+        subset = np.uint32(numbers_to_mask(numbers))
+        return (self.masks(field) & subset) == subset
+
+    def count_containing(self, numbers, field=None):
+        """Сколько тиражей содержат весь набор чисел"""
+        return int(np.count_nonzero(self.contains(numbers, field)))
+
+    def match_counts(self, ticket_1, ticket_2=None):
+        """Совпадения билета с каждым тиражом (поле 1 + поле 2)"""
+        matches = popcount(self.field_1 & np.uint32(numbers_to_mask(ticket_1)))
+        if ticket_2 is not None:
+            matches = matches + popcount(self.field_2 & np.uint32(numbers_to_mask(ticket_2)))
+        return matches
+
+    def match_histogram(self, ticket_1, ticket_2=None):
+        """Сколько тиражей дали 0, 1, 2, ... совпадений с билетом"""
+        max_matches = 8 if ticket_2 is not None else 4
+        return np.bincount(self.match_counts(ticket_1, ticket_2), minlength=max_matches + 1)
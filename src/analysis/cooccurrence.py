@@ -0,0 +1,103 @@
+"""
+Совместные выпадения чисел: матрицы пар 20x20 и тройки
+
+Матрицы считаются по битовым маскам DrawSnapshot (MaskIndex.cooccurrence /
+triples) и хранятся вместе с версией данных. Новые тиражи дописываются в
+конец среза, поэтому модель добавляет к счетчикам только их; полный пересчет -
+только когда DrawStore перезагрузился целиком (сменилось поколение среза).
+"""
+
+import threading
+from itertools import combinations
+
+import numpy as np
+
+from src.analysis.bitmask import MaskIndex, NUMBERS_COUNT
+
+# Ключи матриц пар: поле 1, поле 2, оба поля (сумма), число поля 1 x число поля 2
+PAIR_KEYS = [1, 2, 'all', 'cross']
+TRIPLE_KEYS = [1, 2, 'all']
+
+# Индексы i < j < k тензора троек
+_TRIPLE_INDEX = np.array(list(combinations(range(NUMBERS_COUNT), 3)))
+
+
+class CooccurrenceModel:
+    """Счетчики пар и троек для одного поколения DrawStore"""
+
+    def __init__(self):
+        self.generation = None
+        self.version = None
+        self.rows = 0
+        self.pairs = {}
+        self.triples = {}
+
+    def _reset(self, generation):
+        self.generation = generation
+        self.version = None
+        self.rows = 0
+        self.pairs = {key: np.zeros((NUMBERS_COUNT, NUMBERS_COUNT), dtype=np.int64) for key in PAIR_KEYS}
+        self.triples = {key: np.zeros((NUMBERS_COUNT,) * 3, dtype=np.int64) for key in TRIPLE_KEYS}
+
+    def update(self, snapshot):
+        """Догоняет срез: считает только тиражи, добавленные после прошлого вызова"""
+        if snapshot.generation != self.generation or len(snapshot) < self.rows:
+            self._reset(snapshot.generation)
+
+        if len(snapshot) > self.rows:
+            added = MaskIndex(snapshot.masks.field_1[self.rows:], snapshot.masks.field_2[self.rows:])
+            for field in (1, 2):
+                pairs = added.cooccurrence(field)
+                triples = added.triples(field)
+                self.pairs[field] += pairs
+                self.pairs['all'] += pairs
+                self.triples[field] += triples
+                self.triples['all'] += triples
+            self.pairs['cross'] += added.cooccurrence(1, 2)
+            self.rows = len(snapshot)
+
+        self.version = snapshot.version
+        return self
+
+    def top_pairs(self, key='all', limit=10):
+        """Самые частые пары [{'numbers': [a, b], 'count': n}, ...]"""
+        matrix = self.pairs[key]
+        if key == 'cross':
+            rows, cols = np.indices(matrix.shape).reshape(2, -1)
+        else:
+            rows, cols = np.triu_indices(NUMBERS_COUNT, k=1)
+        counts = matrix[rows, cols]
+        order = np.argsort(-counts, kind='stable')[:limit]
+        return [
+            {'numbers': [int(rows[i]) + 1, int(cols[i]) + 1], 'count': int(counts[i])}
+            for i in order if counts[i] > 0
+        ]
+
+    def top_triples(self, key='all', limit=10):
+        """Самые частые тройки [{'numbers': [a, b, c], 'count': n}, ...]"""
+        i, j, k = _TRIPLE_INDEX.T
+        counts = self.triples[key][i, j, k]
+        order = np.argsort(-counts, kind='stable')[:limit]
+        return [
+            {'numbers': [int(n) + 1 for n in _TRIPLE_INDEX[index]], 'count': int(counts[index])}
+            for index in order if counts[index] > 0
+        ]
+
+
+_model = CooccurrenceModel()
+_lock = threading.Lock()
+
+
+def describe_cooccurrence(snapshot, key='all', limit=10):
+    """Матрица пар, топ пар и троек для ответа API (под блокировкой модели)"""
+    with _lock:
+        if _model.version != snapshot.version or _model.generation != snapshot.generation:
+            _model.update(snapshot)
+        return {
+            'field': key,
+            'draws': _model.rows,
+            'data_version': _model.version,
+            'matrix': _model.pairs[key].tolist(),
+            'top_pairs': _model.top_pairs(key, limit),
+            'top_triples': _model.top_triples(key, limit) if key in TRIPLE_KEYS else [],
+        }
@@ -0,0 +1,414 @@
+"""
+DrawStore - общая на процесс копия тиражей в памяти (NumPy)
+
+Числа всех тиражей лежат матрицей N x 8 uint8 (поле 1 - столбцы 0..3,
+поле 2 - столбцы 4..7) в хронологическом порядке, рядом - время тиража,
+маски полей и погодные признаки из draw_weather. Эндпоинты статистики и
+Felix Pila считают по этим массивам, не обращаясь к SQLite.
+
+Актуальность проверяется по счетчику data_version (app_meta), который
+увеличивают все писатели. При смене версии догружаются только новые тиражи
+и измененные строки draw_weather; полная перезагрузка - если тиражи
+переписаны (draws_rewritten) или новый тираж оказался раньше последнего.
+
+Для окон по времени хранятся префиксные суммы выпадений каждого числа по
+полям: частоты за любое окно тиражей - разность двух столбцов, O(20).
+
+Срез сохраняется в дисковый кэш: после перезапуска он читается за
+миллисекунды и догружается до текущей версии, как срез в памяти.
+"""
+
+import threading
+
+import numpy as np
+
+from src.analysis.bitmask import MaskIndex, NUMBERS_COUNT, masks_to_bits
+from src.database.db import get_connection, get_db_path
+from src.database.meta import DATA_VERSION, DRAWS_REWRITTEN, get_counter
+from src.database.number_stats import draw_order
+from src.database.timestamps import DAY_SECONDS
+from src.utils.disk_cache import get_disk_cache
+
+WEATHER_COLUMNS = ['temperature', 'humidity', 'pressure_mmhg', 'wind_speed']
+TEXT_COLUMNS = ['description', 'wind_direction']
+
+FIELD_COLUMNS = {1: slice(0, 4), 2: slice(4, 8), None: slice(0, 8)}
+
+# Окна period=... в секундах, отсчитываются от последнего тиража
+PERIODS = {
+    'day': DAY_SECONDS,
+    'week': 7 * DAY_SECONDS,
+    'month': 30 * DAY_SECONDS,
+    'year': 365 * DAY_SECONDS,
+}
+
+
+def _lookup(sorted_ids, order, wanted):
+    """Позиции wanted в массиве id (-1, если id нет)"""
+    if not len(sorted_ids):
+        return np.full(len(wanted), -1, dtype=np.int64)
+    pos = np.clip(np.searchsorted(sorted_ids, wanted), 0, len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == wanted, order[pos], -1)
+
+
+def _matrix_masks(numbers):
+    """Матрица чисел (N, 4) -> маски поля uint32"""
+    numbers = numbers.astype(np.uint32)
+    bits = np.where(numbers > 0, np.uint32(1) << (np.maximum(numbers, 1) - 1), 0).astype(np.uint32)
+    return np.bitwise_or.reduce(bits, axis=1) if len(bits) else np.zeros(0, dtype=np.uint32)
+
+
+def _extend_cumulative(cumulative, masks):
+    """Префиксные суммы (20, N + 1) + новые тиражи -> (20, N + M + 1)"""
+    if cumulative is None:
+        cumulative = np.zeros((NUMBERS_COUNT, 1), dtype=np.int32)
+    if not len(masks):
+        return cumulative
+    added = np.cumsum(masks_to_bits(masks).T, axis=1, dtype=np.int32) + cumulative[:, -1:]
+    return np.concatenate([cumulative, added], axis=1)
+
+
+class DrawSnapshot:
+    """Неизменяемый срез данных одной версии - безопасно читать из любых потоков"""
+
+    def __init__(self, db_path, version, rewritten, draw_ids, draw_numbers, draw_ts, numbers, weather, text,
+                 masks=None, cumulative=None, generation=0):
+        self.db_path = db_path
+        # Номер полной загрузки: внутри поколения срезы только дописываются в конец
+        self.generation = generation
+        self.version = version
+        self.rewritten = rewritten
+        self.draw_ids = draw_ids
+        self.draw_numbers = draw_numbers
+        self.draw_ts = draw_ts
+        self.numbers = numbers
+        self.weather = weather
+        # Текстовые признаки: {колонка: (коды int32, словарь значений)}, -1 - нет значения
+        self.text = text
+
+        if masks is None:
+            masks = MaskIndex(_matrix_masks(numbers[:, 0:4]), _matrix_masks(numbers[:, 4:8]))
+        self.masks = masks
+        # {поле: (20, N + 1)}: cumulative[f][n - 1, i] - выпадений числа n в первых i тиражах
+        if cumulative is None:
+            cumulative = {field: _extend_cumulative(None, masks.masks(field)) for field in (1, 2)}
+        self.cumulative = cumulative
+
+        self._order = np.argsort(draw_ids, kind='stable')
+        self._sorted_ids = draw_ids[self._order]
+
+    def __len__(self):
+        return len(self.draw_ids)
+
+    def positions(self, draw_ids):
+        """Индексы строк для id тиражей (-1 - тиража нет в срезе)"""
+        return _lookup(self._sorted_ids, self._order, np.asarray(draw_ids, dtype=np.int64))
+
+    def frequency(self, field=None, rows=None):
+        """Частоты чисел 1..20 (индекс 0 - число 1) по всем или выбранным строкам"""
+        numbers = self.numbers if rows is None else self.numbers[rows]
+        counts = np.bincount(numbers[:, FIELD_COLUMNS[field]].ravel(), minlength=NUMBERS_COUNT + 1)
+        return counts[1:NUMBERS_COUNT + 1]
+
+    def window(self, period=None, last=None, start_ts=None, end_ts=None):
+        """Границы [lo, hi) окна тиражей.
+
+        last - последние N тиражей; period - day/week/month/year от последнего
+        тиража; start_ts/end_ts - диапазон UTC epoch (end не включается).
+        """
+        lo, hi = 0, len(self)
+        if start_ts is not None:
+            lo = int(np.searchsorted(self.draw_ts, start_ts, side='left'))
+        if end_ts is not None:
+            hi = int(np.searchsorted(self.draw_ts, end_ts, side='left'))
+        if period in PERIODS and hi > 0:
+            since = int(self.draw_ts[hi - 1]) - PERIODS[period]
+            lo = max(lo, int(np.searchsorted(self.draw_ts, since, side='right')))
+        if last is not None:
+            lo = max(lo, hi - int(last))
+        return min(lo, hi), hi
+
+    def window_counts(self, lo, hi, field=None):
+        """Частоты чисел 1..20 в тиражах [lo, hi) - две выборки из префиксных сумм"""
+        if field is None:
+            return self.window_counts(lo, hi, 1) + self.window_counts(lo, hi, 2)
+        cumulative = self.cumulative[field]
+        return cumulative[:, hi] - cumulative[:, lo]
+
+    def last_seen(self, lo, hi, field=None):
+        """Индекс последнего тиража окна с каждым числом (-1 - не выпадало).
+
+        Префиксная сумма не убывает, поэтому последний тираж с числом -
+        первая позиция, где сумма уже равна значению на границе окна.
+        """
+        if field is None:
+            return np.maximum(self.last_seen(lo, hi, 1), self.last_seen(lo, hi, 2))
+        cumulative = self.cumulative[field]
+        rows = np.array([
+            np.searchsorted(cumulative[n], cumulative[n, hi], side='left') - 1
+            for n in range(NUMBERS_COUNT)
+        ])
+        return np.where((rows >= lo) & (cumulative[:, hi] > cumulative[:, lo]), rows, -1)
+
+
+def _empty_weather(size):
+    weather = {column: np.full(size, np.nan) for column in WEATHER_COLUMNS}
+    text = {column: (np.full(size, -1, dtype=np.int32), []) for column in TEXT_COLUMNS}
+    return weather, text
+
+
+def _load_draws(conn, after_id):
+    """Тиражи с id > after_id в хронологическом порядке и их матрица чисел"""
+    rows = conn.execute('''
+        SELECT id, draw_number, draw_ts
+        FROM lottery_results
+        WHERE id > ? AND draw_ts IS NOT NULL
+        ORDER BY draw_ts, CAST(draw_number AS INTEGER)
+    ''', (after_id,)).fetchall()
+
+    draw_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    draw_numbers = np.array([row[1] for row in rows], dtype=object)
+    draw_ts = np.array([row[2] for row in rows], dtype=np.int64)
+    numbers = np.zeros((len(rows), 8), dtype=np.uint8)
+
+    if rows:
+        # Диапазон по первичному ключу (draw_id, field, position)
+        cells = np.array(conn.execute('''
+            SELECT draw_id, (field - 1) * 4 + position - 1, number
+            FROM draw_numbers
+            WHERE draw_id > ?
+        ''', (after_id,)).fetchall(), dtype=np.int64).reshape(-1, 3)
+
+        order = np.argsort(draw_ids, kind='stable')
+        row = _lookup(draw_ids[order], order, cells[:, 0])
+        valid = (row >= 0) & (cells[:, 1] >= 0) & (cells[:, 1] < 8)
+        numbers[row[valid], cells[valid, 1]] = cells[valid, 2]
+
+    return draw_ids, draw_numbers, draw_ts, numbers
+
+
+def _apply_weather(conn, snapshot_rows, weather, text, min_version):
+    """Записывает в массивы строки draw_weather с data_version > min_version"""
+    rows = conn.execute(f'''
+        SELECT draw_id, {', '.join(WEATHER_COLUMNS + TEXT_COLUMNS)}
+        FROM draw_weather
+        WHERE data_version > ?
+    ''', (min_version,)).fetchall()
+    if not rows:
+        return
+
+    positions = snapshot_rows(np.array([row[0] for row in rows], dtype=np.int64))
+    found = positions >= 0
+    target = positions[found]
+
+    for i, column in enumerate(WEATHER_COLUMNS, 1):
+        values = np.array([row[i] for row in rows], dtype=float)
+        weather[column][target] = values[found]
+
+    for i, column in enumerate(TEXT_COLUMNS, 1 + len(WEATHER_COLUMNS)):
+        codes, vocabulary = text[column]
+        index = {value: code for code, value in enumerate(vocabulary)}
+        new_codes = []
+        for row in rows:
+            value = row[i]
+            if value is None:
+                new_codes.append(-1)
+                continue
+            if value not in index:
+                index[value] = len(vocabulary)
+                vocabulary.append(value)
+            new_codes.append(index[value])
+        codes[target] = np.array(new_codes, dtype=np.int32)[found]
+
+
+class DrawStore:
+    """Срез тиражей текущей версии данных, общий для всех запросов процесса"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.full_loads = 0
+        self.disk_loads = 0
+        self.appends = 0
+        self._generations = 0
+
+    def get(self):
+        """Актуальный DrawSnapshot (догружается, если data_version сменилась)"""
+        db_path = get_db_path()
+        with get_connection() as conn:
+            version = get_counter(conn, DATA_VERSION)
+            rewritten = get_counter(conn, DRAWS_REWRITTEN)
+
+            snapshot = self._snapshot
+            if self._is_current(snapshot, db_path, version, rewritten):
+                return snapshot
+
+            with self._lock:
+                snapshot = self._snapshot
+                if self._is_current(snapshot, db_path, version, rewritten):
+                    return snapshot
+
+                if snapshot is None:
+                    # После перезапуска - срез из дискового кэша
+                    snapshot = self._disk_load(db_path)
+                    if snapshot is not None and self._is_current(snapshot, db_path, version, rewritten):
+                        self._snapshot = snapshot
+                        return snapshot
+
+                if snapshot is None or snapshot.db_path != db_path or snapshot.rewritten != rewritten \
+                        or snapshot.version > version:
+                    snapshot = None
+                else:
+                    snapshot = self._append(conn, snapshot, version)
+
+                if snapshot is None:
+                    snapshot = self._full_load(conn, db_path, version, rewritten)
+
+                _save_snapshot(snapshot)
+                self._snapshot = snapshot
+                return snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'draws': len(snapshot) if snapshot else 0,
+            'data_version': snapshot.version if snapshot else None,
+            'full_loads': self.full_loads,
+            'disk_loads': self.disk_loads,
+            'appends': self.appends
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    @staticmethod
+    def _is_current(snapshot, db_path, version, rewritten):
+        return (snapshot is not None and snapshot.db_path == db_path
+                and snapshot.version == version and snapshot.rewritten == rewritten)
+
+    def _full_load(self, conn, db_path, version, rewritten):
+        draw_ids, draw_numbers, draw_ts, numbers = _load_draws(conn, 0)
+        weather, text = _empty_weather(len(draw_ids))
+
+        order = np.argsort(draw_ids, kind='stable')
+        sorted_ids = draw_ids[order]
+        _apply_weather(conn, lambda ids: _lookup(sorted_ids, order, ids), weather, text, -1)
+
+        self.full_loads += 1
+        print(f"🧮 DrawStore: загружено тиражей {len(draw_ids)} (версия данных {version})")
+        return DrawSnapshot(db_path, version, rewritten, draw_ids, draw_numbers, draw_ts, numbers, weather, text,
+                            generation=self._next_generation())
+
+    def _next_generation(self):
+        self._generations += 1
+        return self._generations
+
+    def _disk_load(self, db_path):
+        snapshot = _load_snapshot(db_path, self._next_generation())
+        if snapshot is not None:
+            self.disk_loads += 1
+            print(f"🧮 DrawStore: срез из кэша, тиражей {len(snapshot)} (версия данных {snapshot.version})")
+        return snapshot
+
+    def _append(self, conn, snapshot, version):
+        """Догружает новые тиражи и погоду; None - нужна полная перезагрузка"""
+        last_id = int(snapshot.draw_ids.max()) if len(snapshot) else 0
+        draw_ids, draw_numbers, draw_ts, numbers = _load_draws(conn, last_id)
+
+        if len(draw_ids) and len(snapshot):
+            # Новый тираж раньше последнего - порядок нарушен (номер - числом,
+            # как CAST(draw_number AS INTEGER) в _load_draws)
+            last = (int(snapshot.draw_ts[-1]), draw_order(snapshot.draw_numbers[-1]))
+            if (int(draw_ts[0]), draw_order(draw_numbers[0])) < last:
+                return None
+
+        new_weather, new_text = _empty_weather(len(draw_ids))
+        weather = {column: np.concatenate([snapshot.weather[column], new_weather[column]])
+                   for column in WEATHER_COLUMNS}
+        text = {column: (np.concatenate([snapshot.text[column][0], new_text[column][0]]),
+                         list(snapshot.text[column][1]))
+                for column in TEXT_COLUMNS}
+
+        all_ids = np.concatenate([snapshot.draw_ids, draw_ids])
+        order = np.argsort(all_ids, kind='stable')
+        sorted_ids = all_ids[order]
+        _apply_weather(conn, lambda ids: _lookup(sorted_ids, order, ids), weather, text, snapshot.version)
+
+        # Маски и префиксные суммы считаются только для новых тиражей
+        field_1 = _matrix_masks(numbers[:, 0:4])
+        field_2 = _matrix_masks(numbers[:, 4:8])
+        masks = MaskIndex(np.concatenate([snapshot.masks.field_1, field_1]),
+                          np.concatenate([snapshot.masks.field_2, field_2]))
+        cumulative = {
+            1: _extend_cumulative(snapshot.cumulative[1], field_1),
+            2: _extend_cumulative(snapshot.cumulative[2], field_2),
+        }
+
+        self.appends += 1
+        return DrawSnapshot(
+            snapshot.db_path, version, snapshot.rewritten,
+            all_ids,
+            np.concatenate([snapshot.draw_numbers, draw_numbers]),
+            np.concatenate([snapshot.draw_ts, draw_ts]),
+            np.concatenate([snapshot.numbers, numbers]),
+            weather, text, masks, cumulative, snapshot.generation
+        )
+
+
+def _save_snapshot(snapshot):
+    """Массивы среза -> дисковый кэш (маски и префиксные суммы тоже)"""
+    arrays = {
+        'meta': np.array([snapshot.version, snapshot.rewritten], dtype=np.int64),
+        'draw_ids': snapshot.draw_ids,
+        'draw_numbers': snapshot.draw_numbers.astype(str),
+        'draw_ts': snapshot.draw_ts,
+        'numbers': snapshot.numbers,
+        'field_1_mask': snapshot.masks.field_1,
+        'field_2_mask': snapshot.masks.field_2,
+        'cumulative_1': snapshot.cumulative[1],
+        'cumulative_2': snapshot.cumulative[2],
+    }
+    for column in WEATHER_COLUMNS:
+        arrays[f'weather_{column}'] = snapshot.weather[column]
+    for column in TEXT_COLUMNS:
+        codes, vocabulary = snapshot.text[column]
+        arrays[f'codes_{column}'] = codes
+        arrays[f'vocabulary_{column}'] = np.array(vocabulary, dtype=str)
+    get_disk_cache().put_arrays('draw_store', snapshot.db_path, arrays)
+
+
+def _load_snapshot(db_path, generation):
+    """Срез из дискового кэша или None (поколение выдает DrawStore этого процесса)"""
+    arrays = get_disk_cache().get_arrays('draw_store', db_path)
+    if arrays is None:
+        return None
+    try:
+        version, rewritten = (int(value) for value in arrays['meta'])
+        weather = {column: arrays[f'weather_{column}'] for column in WEATHER_COLUMNS}
+        text = {column: (arrays[f'codes_{column}'], arrays[f'vocabulary_{column}'].tolist())
+                for column in TEXT_COLUMNS}
+        return DrawSnapshot(
+            db_path, version, rewritten,
+            arrays['draw_ids'], arrays['draw_numbers'].astype(object), arrays['draw_ts'], arrays['numbers'],
+            weather, text,
+            MaskIndex(arrays['field_1_mask'], arrays['field_2_mask']),
+            {1: arrays['cumulative_1'], 2: arrays['cumulative_2']},
+            generation
+        )
+    except (KeyError, ValueError) as e:
+        print(f"⚠️ DrawStore: срез из кэша не прочитан: {e}")
+        return None
+
+
+_store = DrawStore()
+
+
+def get_draw_store():
+    """Общий на процесс DrawStore"""
+    return _store
+
+
+def get_snapshot():
+    """Актуальный срез тиражей"""
+    return _store.get()
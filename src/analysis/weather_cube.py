@@ -0,0 +1,413 @@
+"""
+Погодный куб для фильтров Felix Pila
+
+Измерения: описание погоды, температура, влажность, давление, скорость и
+направление ветра (все из draw_weather), фаза Луны (по времени тиража).
+Средние в draw_weather округлены до целых, поэтому числовые измерения
+хранятся целыми значениями и фильтр BETWEEN min AND max - точный срез.
+
+Плотный массив по всем измерениям занял бы миллиарды ячеек, поэтому
+хранятся только занятые ячейки: координаты (K, 7) и счетчики чисел
+(K, 2, 20) + число тиражей (K,). Любая комбинация фильтров - булева маска
+по K ячейкам и сумма, K не больше числа тиражей (обычно в разы меньше).
+Для окна "последние N подходящих тиражей" у каждого тиража хранятся его
+ячейка, маски полей, draw_ts и номер - окно считается по ним.
+
+Куб хранится в дисковом кэше (ключ - файл БД и версия данных) и
+догружается по draw_weather.data_version: у измененного тиража старый
+вклад вычитается.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from src.analysis.bitmask import NUMBERS_COUNT, masks_to_bits
+from src.database.db import get_connection, get_db_path
+from src.database.meta import DATA_VERSION, DRAWS_REWRITTEN, get_counter
+from src.database.timestamps import DAY_SECONDS
+from src.utils.disk_cache import get_disk_cache
+
+# Пространство имен в дисковом кэше
+CACHE_NAMESPACE = 'weather_cube'
+
+# Измерения куба: колонки draw_weather и фаза Луны (moon)
+DIMENSIONS = ['description', 'temperature', 'humidity', 'pressure_mmhg', 'wind_speed', 'wind_direction', 'moon']
+TEXT_DIMENSIONS = ['description', 'wind_direction']
+NUMERIC_DIMENSIONS = ['temperature', 'humidity', 'pressure_mmhg', 'wind_speed']
+
+# Нет значения - в диапазоны не попадает
+MISSING = -(1 << 30)
+
+# Фильтр parse_filters_from_request() -> измерение и параметр запроса
+RANGE_FILTERS = [
+    ('temperature', 'temp_min', 'temp_max', 'temp'),
+    ('humidity', 'humidity_min', 'humidity_max', 'humidity'),
+    ('pressure_mmhg', 'pressure_min', 'pressure_max', 'pressure'),
+    ('wind_speed', 'wind_speed_min', 'wind_speed_max', 'wind_speed'),
+]
+TEXT_FILTERS = [('description', 'weather', 'weather'), ('wind_direction', 'wind_direction', 'wind_dir')]
+
+# Корзины диапазонных селектов Felix Pila: параметр -> (от, до, шаг), значения 'a_b'
+RANGE_FACETS = {
+    'temp': (-50, 50, 5),
+    'humidity': (0, 100, 10),
+    'pressure': (730, 775, 5),
+    'wind_speed': (0, 40, 5),
+}
+
+# Фазы Луны (значения фильтра moon на странице Felix Pila)
+MOON_PHASES = ['new', 'waxing', 'full', 'waning']
+_SYNODIC_MONTH = 29.530588853
+_KNOWN_NEW_MOON = 947182440  # 2000-01-06 18:14 UTC
+
+
+def moon_phase_codes(draw_ts):
+    """Фаза Луны для epoch-времен: 0 новолуние, 1 растущая, 2 полнолуние, 3 убывающая"""
+    age = ((np.asarray(draw_ts, dtype=float) - _KNOWN_NEW_MOON) / DAY_SECONDS) % _SYNODIC_MONTH
+    half = _SYNODIC_MONTH / 2
+    codes = np.where(age < half, 1, 3)
+    codes = np.where((age < 1.5) | (age > _SYNODIC_MONTH - 1.5), 0, codes)
+    codes = np.where(np.abs(age - half) < 1.5, 2, codes)
+    return codes.astype(np.int64)
+
+
+class WeatherCube:
+    """Занятые ячейки куба и вклад каждого тиража"""
+
+    def __init__(self):
+        self.db_path = None
+        self.version = None
+        self.rewritten = None
+        self.coords = np.zeros((0, len(DIMENSIONS)), dtype=np.int64)
+        self.counts = np.zeros((0, 2, NUMBERS_COUNT), dtype=np.int64)
+        self.draws = np.zeros(0, dtype=np.int64)
+        self.vocabulary = {column: [] for column in TEXT_DIMENSIONS}
+        # Тиражи в кубе: id (отсортированы), ячейка, маски полей, время и номер
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.cells = np.zeros(0, dtype=np.int64)
+        self.masks = np.zeros((0, 2), dtype=np.uint32)
+        self.draw_ts = np.zeros(0, dtype=np.int64)
+        self.draw_order = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.coords)
+
+    def copy(self):
+        """Независимая копия для догрузки: опубликованный куб читают без блокировки"""
+        cube = WeatherCube()
+        cube.db_path, cube.version, cube.rewritten = self.db_path, self.version, self.rewritten
+        cube.coords, cube.counts, cube.draws = self.coords.copy(), self.counts.copy(), self.draws.copy()
+        cube.vocabulary = {column: list(values) for column, values in self.vocabulary.items()}
+        cube.ids, cube.cells, cube.masks = self.ids.copy(), self.cells.copy(), self.masks.copy()
+        cube.draw_ts, cube.draw_order = self.draw_ts.copy(), self.draw_order.copy()
+        return cube
+
+    def _text_code(self, column, value):
+        if value is None:
+            return MISSING
+        vocabulary = self.vocabulary[column]
+        if value not in vocabulary:
+            vocabulary.append(value)
+        return vocabulary.index(value)
+
+    def _cell_indexes(self, coords):
+        """Индексы ячеек для координат (новые ячейки добавляются)"""
+        index = {tuple(row): i for i, row in enumerate(self.coords.tolist())}
+        cells = np.empty(len(coords), dtype=np.int64)
+        added = []
+        for i, row in enumerate(map(tuple, coords.tolist())):
+            if row not in index:
+                index[row] = len(index)
+                added.append(row)
+            cells[i] = index[row]
+        if added:
+            self.coords = np.concatenate([self.coords, np.array(added, dtype=np.int64)])
+            self.counts = np.concatenate([self.counts, np.zeros((len(added), 2, NUMBERS_COUNT), dtype=np.int64)])
+            self.draws = np.concatenate([self.draws, np.zeros(len(added), dtype=np.int64)])
+        return cells
+
+    def _accumulate(self, cells, masks, sign):
+        if not len(cells):
+            return
+        for field in (0, 1):
+            np.add.at(self.counts[:, field], cells, sign * masks_to_bits(masks[:, field]).astype(np.int64))
+        np.add.at(self.draws, cells, sign)
+
+    def apply_rows(self, rows):
+        """Учитывает строки draw_weather (draw_id, draw_ts, draw_order, маски, погодные колонки).
+
+        Меняет куб на месте - опубликованный куб догружается через copy()
+        """
+        if not rows:
+            return
+
+        ids = np.array([row['draw_id'] for row in rows], dtype=np.int64)
+        masks = np.array([(row['field_1_mask'] or 0, row['field_2_mask'] or 0) for row in rows],
+                         dtype=np.uint32).reshape(-1, 2)
+        draw_ts = np.array([row['draw_ts'] for row in rows], dtype=np.int64)
+        draw_order = np.array([row['draw_order'] for row in rows], dtype=np.int64)
+
+        coords = np.empty((len(rows), len(DIMENSIONS)), dtype=np.int64)
+        for d, column in enumerate(DIMENSIONS):
+            if column in TEXT_DIMENSIONS:
+                coords[:, d] = [self._text_code(column, row[column]) for row in rows]
+            elif column in NUMERIC_DIMENSIONS:
+                coords[:, d] = [MISSING if row[column] is None else int(round(row[column])) for row in rows]
+        coords[:, DIMENSIONS.index('moon')] = moon_phase_codes([row['draw_ts'] for row in rows])
+
+        cells = self._cell_indexes(coords)
+
+        # Уже учтенные тиражи: вычитаем прежний вклад
+        if len(self.ids):
+            pos = np.clip(np.searchsorted(self.ids, ids), 0, len(self.ids) - 1)
+            known = self.ids[pos] == ids
+        else:
+            pos = np.zeros(len(ids), dtype=np.int64)
+            known = np.zeros(len(ids), dtype=bool)
+        self._accumulate(self.cells[pos[known]], self.masks[pos[known]], -1)
+
+        self.cells[pos[known]] = cells[known]
+        self.masks[pos[known]] = masks[known]
+        self.draw_ts[pos[known]] = draw_ts[known]
+        self.draw_order[pos[known]] = draw_order[known]
+
+        new = ~known
+        self.ids = np.concatenate([self.ids, ids[new]])
+        self.cells = np.concatenate([self.cells, cells[new]])
+        self.masks = np.concatenate([self.masks, masks[new]])
+        self.draw_ts = np.concatenate([self.draw_ts, draw_ts[new]])
+        self.draw_order = np.concatenate([self.draw_order, draw_order[new]])
+        order = np.argsort(self.ids, kind='stable')
+        self.ids, self.cells, self.masks = self.ids[order], self.cells[order], self.masks[order]
+        self.draw_ts, self.draw_order = self.draw_ts[order], self.draw_order[order]
+
+        self._accumulate(cells, masks, 1)
+
+    def clause_masks(self, filters, clauses=None):
+        """Маски ячеек по каждому заданному фильтру: {параметр запроса: маска}.
+
+        clauses - общий словарь масок отдельных условий: у соседних наборов
+        фильтров большинство условий совпадает и считается один раз.
+        """
+        if clauses is None:
+            clauses = {}
+
+        def clause(key, build):
+            if key not in clauses:
+                clauses[key] = build()
+            return clauses[key]
+
+        masks = {}
+
+        for column, min_key, max_key, param in RANGE_FILTERS:
+            if min_key in filters and max_key in filters:
+                low, high = math.ceil(filters[min_key]), math.floor(filters[max_key])
+                values = self.coords[:, DIMENSIONS.index(column)]
+                masks[param] = clause((column, low, high), lambda: (values >= low) & (values <= high))
+
+        for column, key, param in TEXT_FILTERS:
+            if filters.get(key):
+                text = filters[key]
+                matching = [code for code, value in enumerate(self.vocabulary[column]) if text in value]
+                values = self.coords[:, DIMENSIONS.index(column)]
+                masks[param] = clause((column, text), lambda: np.isin(values, matching))
+
+        if filters.get('moon_phase') in MOON_PHASES:
+            code = MOON_PHASES.index(filters['moon_phase'])
+            masks['moon'] = clause(('moon', code), lambda: self.coords[:, DIMENSIONS.index('moon')] == code)
+
+        return masks
+
+    def select(self, filters, clauses=None):
+        """Булева маска ячеек под фильтры parse_filters_from_request()"""
+        selected = np.ones(len(self), dtype=bool)
+        for mask in self.clause_masks(filters, clauses).values():
+            selected &= mask
+        return selected
+
+    def _latest(self, selected, latest):
+        """(счетчики, число тиражей) по последним latest тиражам в ячейках selected.
+
+        Порядок - draw_ts, затем номер тиража числом, как ORDER BY прежнего
+        SQL прогноза (draw_ts DESC, CAST(draw_number AS INTEGER) DESC LIMIT N).
+        """
+        rows = np.flatnonzero(selected[self.cells])
+        rows = rows[np.lexsort((self.draw_order[rows], self.draw_ts[rows]))[::-1][:latest]]
+        counts = np.stack([masks_to_bits(self.masks[rows, field]).sum(axis=0, dtype=np.int64) for field in (0, 1)])
+        return counts, len(rows)
+
+    def query(self, filters, latest=None):
+        """(счетчики чисел (2, 20), число тиражей) для комбинации фильтров.
+
+        latest - считать только последние N подходящих тиражей (None - все).
+        """
+        selected = self.select(filters)
+        if latest is not None:
+            return self._latest(selected, latest)
+        return self.counts[selected].sum(axis=0), int(self.draws[selected].sum())
+
+    def query_many(self, filter_sets, latest=None):
+        """query() для списка наборов фильтров одним проходом по ячейкам.
+
+        Маски наборов (F, K) умножаются на счетчики ячеек (K, 40) одним
+        матричным произведением. Возвращает (счетчики (F, 2, 20), тиражи (F,)).
+        С окном latest наборы считаются по тиражам, по одному на набор.
+        """
+        clauses = {}
+        if latest is not None:
+            results = [self._latest(self.select(filters, clauses), latest) for filters in filter_sets]
+            counts = np.array([counts for counts, _ in results], dtype=np.int64)
+            return counts.reshape(len(filter_sets), 2, NUMBERS_COUNT), np.array([draws for _, draws in results])
+        selected = np.array([self.select(filters, clauses) for filters in filter_sets], dtype=np.int64)
+        selected = selected.reshape(len(filter_sets), len(self))
+        counts = selected @ self.counts.reshape(len(self), 2 * NUMBERS_COUNT)
+        return counts.reshape(len(filter_sets), 2, NUMBERS_COUNT), selected @ self.draws
+
+    def facets(self, filters):
+        """Число тиражей для каждого значения каждого фильтра (cross-filter).
+
+        Значения фильтра считаются при всех остальных выбранных фильтрах,
+        собственный фильтр не учитывается - как в фасетном поиске. Все
+        фасеты - матричные произведения по K ячейкам, без запросов к БД.
+        """
+        masks = self.clause_masks(filters)
+
+        def others(param):
+            selected = np.ones(len(self), dtype=bool)
+            for key, mask in masks.items():
+                if key != param:
+                    selected &= mask
+            return self.draws * selected
+
+        facets = {}
+
+        for column, _, _, param in RANGE_FILTERS:
+            start, stop, step = RANGE_FACETS[param]
+            lows = np.arange(start, stop, step)
+            values = self.coords[:, DIMENSIONS.index(column)]
+            # Границы включительно, как BETWEEN в фильтре
+            inside = (values >= lows[:, None]) & (values <= lows[:, None] + step)
+            counts = inside.astype(np.int64) @ others(param)
+            facets[param] = {f"{low}_{low + step}": int(count) for low, count in zip(lows, counts)}
+
+        for column, _, param in TEXT_FILTERS:
+            vocabulary = self.vocabulary[column]
+            codes = self.coords[:, DIMENSIONS.index(column)]
+            known = codes >= 0
+            per_code = np.bincount(codes[known], weights=others(param)[known], minlength=len(vocabulary))
+            # Значение фильтра - подстрока описания ("снег" включает "небольшой снег")
+            contains = np.array([[value in other for other in vocabulary] for value in vocabulary], dtype=bool)
+            counts = contains.reshape(len(vocabulary), len(vocabulary)).astype(np.int64) @ per_code.astype(np.int64)
+            facets[param] = {value: int(count) for value, count in zip(vocabulary, counts)}
+
+        moon_counts = np.bincount(self.coords[:, DIMENSIONS.index('moon')], weights=others('moon'),
+                                  minlength=len(MOON_PHASES))
+        facets['moon'] = {phase: int(count) for phase, count in zip(MOON_PHASES, moon_counts)}
+
+        return int(others(None).sum()), facets
+
+    @property
+    def total_draws(self):
+        return int(self.draws.sum())
+
+    def save(self):
+        """В дисковый кэш по ключу (файл БД, версия данных), без pickle"""
+        arrays = {
+            'meta': np.array([self.version, self.rewritten], dtype=np.int64),
+            'coords': self.coords, 'counts': self.counts, 'draws': self.draws,
+            'ids': self.ids, 'cells': self.cells, 'masks': self.masks,
+            'draw_ts': self.draw_ts, 'draw_order': self.draw_order,
+        }
+        for column in TEXT_DIMENSIONS:
+            arrays[f'vocabulary_{column}'] = np.array(self.vocabulary[column], dtype=str)
+        return get_disk_cache().put_arrays(CACHE_NAMESPACE, (self.db_path, self.version), arrays)
+
+    @classmethod
+    def load(cls, db_path, version):
+        """Куб версии version из дискового кэша или None"""
+        arrays = get_disk_cache().get_arrays(CACHE_NAMESPACE, (db_path, version))
+        if arrays is None:
+            return None
+        try:
+            cube = cls()
+            cube.db_path = db_path
+            cube.version, cube.rewritten = (int(value) for value in arrays['meta'])
+            cube.coords, cube.counts, cube.draws = arrays['coords'], arrays['counts'], arrays['draws']
+            cube.ids, cube.cells, cube.masks = arrays['ids'], arrays['cells'], arrays['masks']
+            cube.draw_ts, cube.draw_order = arrays['draw_ts'], arrays['draw_order']
+            cube.vocabulary = {column: arrays[f'vocabulary_{column}'].tolist() for column in TEXT_DIMENSIONS}
+        except (KeyError, ValueError) as e:
+            print(f"⚠️ Погодный куб не прочитан: {e}")
+            return None
+        if cube.coords.shape[1:] != (len(DIMENSIONS),):
+            return None
+        return cube
+
+
+_ROWS_SQL = f'''
+    SELECT draw_id, draw_ts, CAST(draw_number AS INTEGER) AS draw_order, field_1_mask, field_2_mask,
+           {', '.join(NUMERIC_DIMENSIONS + TEXT_DIMENSIONS)}
+    FROM draw_weather
+    WHERE data_version > ?
+'''
+
+_cube = None
+_cube_lock = threading.Lock()
+
+
+def _is_current(cube, db_path, version, rewritten):
+    return (cube is not None and cube.db_path == db_path
+            and cube.version == version and cube.rewritten == rewritten)
+
+
+def get_weather_cube():
+    """Куб, актуальный для текущей версии данных (из памяти, файла или БД).
+
+    Как в DrawStore.get: опубликованный куб актуальной версии отдается без
+    блокировки, _cube_lock берется только для загрузки или догрузки.
+    Догрузка идет на копии, новый куб публикуется заменой ссылки _cube:
+    читатели query()/facets() не видят полуобновленных массивов.
+    """
+    global _cube
+    db_path = get_db_path()
+    with get_connection() as conn:
+        version = get_counter(conn, DATA_VERSION)
+        rewritten = get_counter(conn, DRAWS_REWRITTEN)
+
+        cube = _cube
+        if _is_current(cube, db_path, version, rewritten):
+            return cube
+
+        with _cube_lock:
+            cube = _cube
+            if _is_current(cube, db_path, version, rewritten):
+                return cube
+
+            if cube is None or cube.db_path != db_path:
+                cube = WeatherCube.load(db_path, version)
+            previous = cube.version if cube is not None and cube.db_path == db_path else None
+
+            # Версия куба новее данных - БД заменили или пересоздали, строим заново
+            if cube is not None and cube.db_path == db_path and cube.rewritten == rewritten \
+                    and cube.version <= version:
+                if cube.version == version:
+                    _cube = cube
+                    return cube
+                # Догрузка: строки draw_weather, измененные после версии куба
+                cube = cube.copy()
+                cube.apply_rows(conn.execute(_ROWS_SQL, (cube.version,)).fetchall())
+            else:
+                cube = WeatherCube()
+                cube.db_path = db_path
+                cube.apply_rows(conn.execute(_ROWS_SQL, (-1,)).fetchall())
+                print(f"🧊 Погодный куб построен: тиражей {cube.total_draws}, ячеек {len(cube)}")
+
+            cube.version = version
+            cube.rewritten = rewritten
+            if cube.save() and previous is not None and previous != version:
+                # Куб прежней версии больше не понадобится
+                get_disk_cache().delete(CACHE_NAMESPACE, (db_path, previous))
+            _cube = cube
+            return cube
@@ -1,144 +1,284 @@
-import sqlite3
-from datetime import datetime
-
-class FelixPilaAnalyzer:
-    """Анализатор связи погоды и лотерейных чисел"""
-    
-    def __init__(self):
-        self.db_path = r'D:\VS_code\lotto-meteo-stats\data\lottery.db'
-    
-    def analyze_weather_correlation(self):
-        """Анализирует корреляцию между погодой и выпадением чисел"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 1. Группируем погодные условия
-        weather_categories = {
-            'ясно': ['ясно', 'солнечно', 'малооблачно'],
-            'пасмурно': ['пасмурно', 'облачно', 'тучи'],
-            'дождь': ['дождь', 'ливень', 'морось'],
-            'снег': ['снег', 'метель']
-        }
-        
-        # 2. Группируем температуру
-        temp_ranges = [
-            ('очень холодно', -50, -10),
-            ('холодно', -10, 0),
-            ('прохладно', 0, 10),
-            ('комфортно', 10, 20),
-            ('тепло', 20, 30),
-            ('жарко', 30, 50)
-        ]
-        
-        # 3. Группируем давление
-        pressure_ranges = [
-            ('очень низкое', 0, 720),
-            ('низкое', 720, 740),
-            ('нормальное', 740, 760),
-            ('высокое', 760, 780),
-            ('очень высокое', 780, 1000)
-        ]
-        
-        analysis_results = {}
-        
-        # Анализ для каждого числа
-        for number in range(1, 21):
-            cursor.execute('''
-                SELECT l.draw_number, l.date, l.temperature, l.weather, l.pressure, 
-                       l.field_1, l.field_2
-                FROM lottery_results l
-                WHERE (l.field_1 LIKE ? OR l.field_2 LIKE ?)
-                  AND l.temperature IS NOT NULL
-                  AND l.weather IS NOT NULL
-                ORDER BY l.date
-            ''', (f'%{number}%', f'%{number}%'))
-            
-            records = cursor.fetchall()
-            
-            for record in records:
-                draw_num, date, temp, weather, pressure, field1, field2 = record
-                
-                # Определяем категории
-                weather_cat = self._categorize_weather(weather, weather_categories)
-                temp_cat = self._categorize_temperature(temp, temp_ranges)
-                pressure_cat = self._categorize_pressure(pressure, pressure_ranges)
-                
-                key = f"{weather_cat}_{temp_cat}_{pressure_cat}"
-                
-                if key not in analysis_results:
-                    analysis_results[key] = {
-                        'weather': weather_cat,
-                        'temperature': temp_cat,
-                        'pressure': pressure_cat,
-                        'numbers': {n: 0 for n in range(1, 21)},
-                        'total_draws': 0
-                    }
-                
-                analysis_results[key]['numbers'][number] += 1
-                analysis_results[key]['total_draws'] += 1
-        
-        conn.close()
-        
-        # Рассчитываем вероятности
-        for key, data in analysis_results.items():
-            total = data['total_draws']
-            if total > 0:
-                for num in range(1, 21):
-                    count = data['numbers'][num]
-                    data['numbers'][num] = {
-                        'count': count,
-                        'probability': round((count / total) * 100, 2)
-                    }
-        
-        return analysis_results
-    
-    def _categorize_weather(self, weather_text, categories):
-        """Категоризирует погоду"""
-        weather_lower = weather_text.lower()
-        for category, keywords in categories.items():
-            for keyword in keywords:
-                if keyword in weather_lower:
-                    return category
-        return 'другое'
-    
-    def _categorize_temperature(self, temp, ranges):
-        """Категоризирует температуру"""
-        for name, min_temp, max_temp in ranges:
-            if min_temp <= temp < max_temp:
-                return name
-        return 'неизвестно'
-    
-    def _categorize_pressure(self, pressure, ranges):
-        """Категоризирует давление"""
-        for name, min_press, max_press in ranges:
-            if min_press <= pressure < max_press:
-                return name
-        return 'неизвестно'
-    
-    def predict_numbers(self, current_weather, current_temp, current_pressure):
-        """Прогнозирует числа на основе текущей погоды"""
-        analysis = self.analyze_weather_correlation()
-        
-        # Определяем категории текущей погоды
-        weather_categories = {'ясно': ['ясно'], 'пасмурно': ['пасмурно']}
-        temp_ranges = [('холодно', -10, 0), ('прохладно', 0, 10)]
-        pressure_ranges = [('нормальное', 740, 760)]
-        
-        weather_cat = self._categorize_weather(current_weather, weather_categories)
-        temp_cat = self._categorize_temperature(current_temp, temp_ranges)
-        pressure_cat = self._categorize_pressure(current_pressure, pressure_ranges)
-        
-        key = f"{weather_cat}_{temp_cat}_{pressure_cat}"
-        
-        if key in analysis:
-            numbers_data = analysis[key]['numbers']
-            # Сортируем по вероятности
-            sorted_numbers = sorted(
-                [(num, data['probability']) for num, data in numbers_data.items()],
-                key=lambda x: x[1],
-                reverse=True
-            )
-            return sorted_numbers[:8]  # 8 самых вероятных чисел
-        else:
-            # Возвращаем самые частые числа вообще
-            return [(12, 8.65), (16, 8.65), (1, 7.69), (13, 7.69)]
\ No newline at end of file
+import threading
+
+import numpy as np
+
+from src.analysis.bitmask import NUMBERS_COUNT, masks_to_bits
+from src.database.db import get_connection, get_db_path
+from src.database.meta import DATA_VERSION, DRAWS_REWRITTEN, get_counter
+from src.utils.disk_cache import get_disk_cache
+
+# 1. Группируем погодные условия
+WEATHER_CATEGORIES = {
+    'ясно': ['ясно', 'солнечно', 'малооблачно'],
+    'пасмурно': ['пасмурно', 'облачно', 'тучи'],
+    'дождь': ['дождь', 'ливень', 'морось'],
+    'снег': ['снег', 'метель']
+}
+
+# 2. Группируем температуру
+TEMP_RANGES = [
+    ('очень холодно', -50, -10),
+    ('холодно', -10, 0),
+    ('прохладно', 0, 10),
+    ('комфортно', 10, 20),
+    ('тепло', 20, 30),
+    ('жарко', 30, 50)
+]
+
+# 3. Группируем давление
+PRESSURE_RANGES = [
+    ('очень низкое', 0, 720),
+    ('низкое', 720, 740),
+    ('нормальное', 740, 760),
+    ('высокое', 760, 780),
+    ('очень высокое', 780, 1000)
+]
+
+# Категории текущей погоды в predict_numbers - узкие, как в исходном
+# анализаторе: "солнечно" или "снег" там попадали в "другое", 15° - в
+# "неизвестно". Прогноз берет ячейку тензора по этим категориям.
+PREDICT_WEATHER_CATEGORIES = {'ясно': ['ясно'], 'пасмурно': ['пасмурно']}
+PREDICT_TEMP_RANGES = [('холодно', -10, 0), ('прохладно', 0, 10)]
+PREDICT_PRESSURE_RANGES = [('нормальное', 740, 760)]
+
+# Оси тензора: последняя категория каждой оси - "не распознано"
+WEATHER_AXIS = list(WEATHER_CATEGORIES) + ['другое']
+TEMP_AXIS = [name for name, _, _ in TEMP_RANGES] + ['неизвестно']
+PRESSURE_AXIS = [name for name, _, _ in PRESSURE_RANGES] + ['неизвестно']
+CELLS = len(WEATHER_AXIS) * len(TEMP_AXIS) * len(PRESSURE_AXIS)
+
+# Пространство имен в дисковом кэше
+CACHE_NAMESPACE = 'felix_pila_model'
+
+
+def _range_codes(values, ranges):
+    """Индекс диапазона [min, max) для каждого значения, вне диапазонов - последний"""
+    values = np.asarray(values, dtype=float)
+    codes = np.full(len(values), len(ranges), dtype=np.int64)
+    for code, (_, low, high) in enumerate(ranges):
+        with np.errstate(invalid='ignore'):
+            codes[(values >= low) & (values < high)] = code
+    return codes
+
+
+def _weather_code(weather_text):
+    weather_lower = weather_text.lower()
+    for code, keywords in enumerate(WEATHER_CATEGORIES.values()):
+        for keyword in keywords:
+            if keyword in weather_lower:
+                return code
+    return len(WEATHER_CATEGORIES)
+
+
+class FelixPilaModel:
+    """Тензор (погода, температура, давление) x число и вклад каждого тиража.
+
+    Вклад тиража - числа обоих полей (число в двух полях считается один раз).
+    По каждому тиражу хранятся ячейка и маска, поэтому перепривязка погоды
+    вычитает старый вклад и добавляет новый без полного пересчета.
+    """
+
+    def __init__(self):
+        self.db_path = None
+        self.version = None
+        self.rewritten = None
+        self.counts = np.zeros((CELLS, NUMBERS_COUNT), dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.cells = np.zeros(0, dtype=np.int64)
+        self.masks = np.zeros(0, dtype=np.uint32)
+
+    def tensor(self):
+        return self.counts.reshape(len(WEATHER_AXIS), len(TEMP_AXIS), len(PRESSURE_AXIS), NUMBERS_COUNT)
+
+    def _accumulate(self, cells, masks, sign):
+        valid = cells >= 0
+        if valid.any():
+            np.add.at(self.counts, cells[valid], sign * masks_to_bits(masks[valid]).astype(np.int64))
+
+    def apply_rows(self, rows):
+        """Учитывает строки (id, field_1_mask, field_2_mask, temperature, weather, pressure)"""
+        if not rows:
+            return
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        masks = np.array([(row[1] or 0) | (row[2] or 0) for row in rows], dtype=np.uint32)
+        temperature = np.array([np.nan if row[3] is None else row[3] for row in rows], dtype=float)
+        pressure = np.array([np.nan if row[5] is None else row[5] for row in rows], dtype=float)
+
+        # Описаний погоды немного - категоризируем каждое уникальное один раз
+        weather_codes = {}
+        weather = np.array([
+            -1 if row[4] is None else weather_codes.setdefault(row[4], _weather_code(row[4]))
+            for row in rows
+        ], dtype=np.int64)
+
+        cells = (weather * len(TEMP_AXIS) + _range_codes(temperature, TEMP_RANGES)) * len(PRESSURE_AXIS)
+        cells += _range_codes(pressure, PRESSURE_RANGES)
+        # Без погоды или температуры тираж в модель не входит (как и раньше)
+        cells[(weather < 0) | np.isnan(temperature)] = -1
+
+        # Копии массивов: уже выданный tensor() читателей не меняется
+        self.counts = self.counts.copy()
+        self.cells = self.cells.copy()
+        self.masks = self.masks.copy()
+
+        # Уже учтенные тиражи: вычитаем прежний вклад
+        pos = np.clip(np.searchsorted(self.ids, ids), 0, max(len(self.ids) - 1, 0))
+        known = (pos < len(self.ids)) & (self.ids[pos] == ids) if len(self.ids) else np.zeros(len(ids), bool)
+        self._accumulate(self.cells[pos[known]], self.masks[pos[known]], -1)
+        self.cells[pos[known]] = cells[known]
+        self.masks[pos[known]] = masks[known]
+
+        new = ~known
+        self.ids = np.concatenate([self.ids, ids[new]])
+        self.cells = np.concatenate([self.cells, cells[new]])
+        self.masks = np.concatenate([self.masks, masks[new]])
+        order = np.argsort(self.ids, kind='stable')
+        self.ids, self.cells, self.masks = self.ids[order], self.cells[order], self.masks[order]
+
+        self._accumulate(cells, masks, 1)
+
+    def save(self):
+        """В дисковый кэш по ключу (файл БД, версия данных), без pickle"""
+        return get_disk_cache().put_arrays(CACHE_NAMESPACE, (self.db_path, self.version), {
+            'meta': np.array([self.version, self.rewritten], dtype=np.int64),
+            'counts': self.counts, 'ids': self.ids, 'cells': self.cells, 'masks': self.masks,
+        })
+
+    @classmethod
+    def load(cls, db_path, version):
+        """Модель версии version из дискового кэша или None"""
+        arrays = get_disk_cache().get_arrays(CACHE_NAMESPACE, (db_path, version))
+        if arrays is None:
+            return None
+        try:
+            model = cls()
+            model.db_path = db_path
+            model.version, model.rewritten = (int(value) for value in arrays['meta'])
+            model.counts = arrays['counts']
+            model.ids, model.cells, model.masks = arrays['ids'], arrays['cells'], arrays['masks']
+        except (KeyError, ValueError) as e:
+            print(f"⚠️ Модель Felix Pila не прочитана: {e}")
+            return None
+        if model.counts.shape != (CELLS, NUMBERS_COUNT):
+            return None
+        return model
+
+
+_ROWS_SQL = '''
+    SELECT id, field_1_mask, field_2_mask, temperature, weather, pressure
+    FROM lottery_results
+'''
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """Модель, актуальная для текущей версии данных (из памяти, файла или БД)"""
+    global _model
+    db_path = get_db_path()
+    with _model_lock, get_connection() as conn:
+        version = get_counter(conn, DATA_VERSION)
+        rewritten = get_counter(conn, DRAWS_REWRITTEN)
+
+        model = _model
+        if model is None or model.db_path != db_path:
+            model = FelixPilaModel.load(db_path, version)
+        previous = model.version if model is not None and model.db_path == db_path else None
+
+        if model is not None and model.db_path == db_path and model.rewritten == rewritten:
+            if model.version == version:
+                _model = model
+                return model
+            # Догрузка: только тиражи с перепривязанной погодой
+            model.apply_rows(conn.execute(
+                _ROWS_SQL + " WHERE weather_version > ?", (model.version,)
+            ).fetchall())
+        else:
+            # Один проход по всем тиражам
+            model = FelixPilaModel()
+            model.db_path = db_path
+            model.apply_rows(conn.execute(_ROWS_SQL).fetchall())
+            print(f"🧮 Модель Felix Pila построена: тиражей {len(model.ids)}")
+
+        model.version = version
+        model.rewritten = rewritten
+        if model.save() and previous is not None and previous != version:
+            # Модель прежней версии больше не понадобится
+            get_disk_cache().delete(CACHE_NAMESPACE, (db_path, previous))
+        _model = model
+        return model
+
+
+class FelixPilaAnalyzer:
+    """Анализатор связи погоды и лотерейных чисел"""
+
+    def analyze_weather_correlation(self):
+        """Анализирует корреляцию между погодой и выпадением чисел"""
+        tensor = get_model().tensor()
+
+        analysis_results = {}
+        for w, t, p in zip(*np.nonzero(tensor.sum(axis=3))):
+            counts = tensor[w, t, p]
+            total = int(counts.sum())
+            key = f"{WEATHER_AXIS[w]}_{TEMP_AXIS[t]}_{PRESSURE_AXIS[p]}"
+            analysis_results[key] = {
+                'weather': WEATHER_AXIS[w],
+                'temperature': TEMP_AXIS[t],
+                'pressure': PRESSURE_AXIS[p],
+                'numbers': {
+                    num: {
+                        'count': int(counts[num - 1]),
+                        'probability': round((int(counts[num - 1]) / total) * 100, 2)
+                    }
+                    for num in range(1, 21)
+                },
+                'total_draws': total
+            }
+
+        return analysis_results
+
+    def _categorize_weather(self, weather_text, categories=WEATHER_CATEGORIES):
+        """Категоризирует погоду"""
+        weather_lower = weather_text.lower()
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                if keyword in weather_lower:
+                    return category
+        return 'другое'
+
+    def _categorize_temperature(self, temp, ranges=TEMP_RANGES):
+        """Категоризирует температуру"""
+        for name, min_temp, max_temp in ranges:
+            if min_temp <= temp < max_temp:
+                return name
+        return 'неизвестно'
+
+    def _categorize_pressure(self, pressure, ranges=PRESSURE_RANGES):
+        """Категоризирует давление"""
+        for name, min_press, max_press in ranges:
+            if min_press <= pressure < max_press:
+                return name
+        return 'неизвестно'
+
+    def predict_numbers(self, current_weather, current_temp, current_pressure):
+        """Прогнозирует числа на основе текущей погоды - выборка ячейки тензора"""
+        w = WEATHER_AXIS.index(self._categorize_weather(current_weather, PREDICT_WEATHER_CATEGORIES))
+        t = TEMP_AXIS.index(self._categorize_temperature(current_temp, PREDICT_TEMP_RANGES))
+        p = PRESSURE_AXIS.index(self._categorize_pressure(current_pressure, PREDICT_PRESSURE_RANGES))
+
+        counts = get_model().tensor()[w, t, p]
+        total = int(counts.sum())
+
+        if total > 0:
+            # Сортируем по вероятности
+            sorted_numbers = sorted(
+                [(num, round((int(counts[num - 1]) / total) * 100, 2)) for num in range(1, 21)],
+                key=lambda x: x[1],
+                reverse=True
+            )
+            return sorted_numbers[:8]  # 8 самых вероятных чисел
+        else:
+            # Возвращаем самые частые числа вообще
+            return [(12, 8.65), (16, 8.65), (1, 7.69), (13, 7.69)]
@@ -0,0 +1,98 @@
+"""
+Привязка погоды к тиражам: каждому тиражу - ближайший по времени замер
+
+Замеры из weather_history в нужном диапазоне грузятся одним индексным
+запросом, ближайший ищется через numpy.searchsorted по отсортированным
+epoch-временам. В обычном режиме обрабатываются только тиражи без привязки.
+"""
+
+import numpy as np
+
+from config import Config
+from src.database.db import transaction
+from src.database.meta import bump_data_version
+
+
+def _nearest(weather_ts, draw_ts):
+    """Индекс ближайшего замера для каждого тиража и расстояние до него, сек"""
+    right = np.searchsorted(weather_ts, draw_ts)
+    left = np.clip(right - 1, 0, len(weather_ts) - 1)
+    right = np.clip(right, 0, len(weather_ts) - 1)
+
+    left_delta = np.abs(draw_ts - weather_ts[left])
+    right_delta = np.abs(weather_ts[right] - draw_ts)
+
+    use_right = right_delta < left_delta
+    nearest = np.where(use_right, right, left)
+    delta = np.where(use_right, right_delta, left_delta)
+    return nearest, delta
+
+
+def attribute_weather(only_missing=True, tolerance_min=None):
+    """Привязывает к тиражам ближайший замер погоды в пределах допуска.
+
+    only_missing=True - только тиражи без привязки (инкрементальный режим
+    после парсера и сбора погоды), False - полный пересчет всей истории.
+    Возвращает количество тиражей, получивших привязку.
+    """
+    if tolerance_min is None:
+        tolerance_min = Config.WEATHER_ATTRIBUTION_TOLERANCE_MIN
+    tolerance = int(tolerance_min) * 60
+
+    with transaction() as conn:
+        sql = "SELECT id, draw_ts FROM lottery_results WHERE draw_ts IS NOT NULL"
+        if only_missing:
+            sql += " AND weather_id IS NULL"
+        draws = conn.execute(sql + " ORDER BY draw_ts").fetchall()
+
+        if not draws:
+            return 0
+
+        draw_ids = np.array([row[0] for row in draws], dtype=np.int64)
+        draw_ts = np.array([row[1] for row in draws], dtype=np.int64)
+
+        # Только замеры, которые могут оказаться ближайшими (индекс по ts_epoch)
+        weather = conn.execute('''
+            SELECT id, ts_epoch, temperature, weather_description, pressure_mmhg
+            FROM weather_history
+            WHERE ts_epoch BETWEEN ? AND ?
+            ORDER BY ts_epoch
+        ''', (int(draw_ts[0]) - tolerance, int(draw_ts[-1]) + tolerance)).fetchall()
+
+        updates = []
+        if weather:
+            weather_ts = np.array([row[1] for row in weather], dtype=np.int64)
+            nearest, delta = _nearest(weather_ts, draw_ts)
+
+            for draw_id, index, seconds in zip(draw_ids.tolist(), nearest.tolist(), delta.tolist()):
+                if seconds > tolerance:
+                    continue
+                weather_id, _, temperature, description, pressure = weather[index]
+                updates.append((weather_id, seconds, temperature, description, pressure, draw_id))
+
+        if not updates and only_missing:
+            return 0
+
+        # Измененные тиражи помечаются новой версией данных (weather_version),
+        # по ней модель FelixPilaAnalyzer догружает только их
+        version = bump_data_version(conn)
+
+        if not only_missing:
+            # Полный пересчет: сбрасываем устаревшие привязки
+            conn.execute('''
+                UPDATE lottery_results
+                SET weather_id = NULL, weather_delta = NULL,
+                    temperature = NULL, weather = NULL, pressure = NULL,
+                    weather_version = ?
+                WHERE weather_id IS NOT NULL
+            ''', (version,))
+
+        conn.executemany('''
+            UPDATE lottery_results
+            SET weather_id = ?, weather_delta = ?, temperature = ?, weather = ?, pressure = ?,
+                weather_version = ?
+            WHERE id = ?
+        ''', [update[:-1] + (version, update[-1]) for update in updates])
+
+    print(f"🔗 Погода привязана к тиражам: {len(updates)} из {len(draws)}")
+    return len(updates)
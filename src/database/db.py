@@ -0,0 +1,203 @@
+"""
+Единый слой доступа к SQLite для всего приложения
+
+Все маршруты, парсеры и анализаторы берут соединения отсюда, а не открывают
+sqlite3.connect() на каждый вызов. Соединения живут в пуле: PRAGMA
+(WAL, mmap, cache_size, synchronous) применяются один раз при создании,
+а подготовленные выражения переиспользуются через кэш sqlite3.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import Config
+
+
+class ConnectionPool:
+    """Пул настроенных соединений SQLite"""
+
+    def __init__(self, db_path, pool_size=None):
+        self.db_path = db_path
+        self.pool_size = pool_size or Config.SQLITE_POOL_SIZE
+        self._idle = queue.LifoQueue(maxsize=self.pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0, 'discarded': 0}
+
+    def _create_connection(self):
+        """Открывает соединение и применяет PRAGMA (один раз на соединение)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=Config.SQLITE_BUSY_TIMEOUT,
+            isolation_level=None,  # транзакции управляются явно через transaction()
+            check_same_thread=False,  # соединение может перейти к другому потоку через пул
+            cached_statements=Config.SQLITE_STATEMENT_CACHE
+        )
+        conn.row_factory = sqlite3.Row
+
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        with self._lock:
+            self._stats['created'] += 1
+        return conn
+
+    def _acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._create_connection()
+
+        with self._lock:
+            self._stats['reused'] += 1
+        return conn
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            with self._lock:
+                self._stats['discarded'] += 1
+
+    @contextmanager
+    def connection(self):
+        """Выдает соединение текущему потоку.
+
+        Вложенные вызовы в одном потоке получают то же самое соединение,
+        поэтому функции могут свободно вызывать друг друга внутри транзакции.
+        """
+        local = self._local
+        conn = getattr(local, 'conn', None)
+
+        if conn is not None:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn = self._acquire()
+        local.conn = conn
+        local.depth = 1
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Соединение внутри транзакции: commit при успехе, rollback при ошибке"""
+        with self.connection() as conn:
+            if conn.in_transaction:
+                # Уже внутри внешней транзакции - она и зафиксирует изменения
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close_all(self):
+        """Закрывает все простаивающие соединения"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['idle'] = self._idle.qsize()
+        stats['pool_size'] = self.pool_size
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_db_path():
+    """Единственный настроенный путь к БД"""
+    return _pool.db_path if _pool is not None else Config.DATABASE_PATH
+
+
+def get_pool():
+    """Возвращает пул процесса, создавая его при первом обращении"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(Config.DATABASE_PATH)
+    return _pool
+
+
+def configure(db_path=None, pool_size=None):
+    """Пересоздает пул (например, для другой БД в скриптах и бенчмарках)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(db_path or Config.DATABASE_PATH, pool_size)
+    return _pool
+
+
+def db_exists():
+    """Проверяет, существует ли файл БД"""
+    return os.path.exists(get_db_path())
+
+
+def get_connection():
+    """Контекстный менеджер соединения из пула"""
+    return get_pool().connection()
+
+
+def transaction():
+    """Контекстный менеджер транзакции на соединении из пула"""
+    return get_pool().transaction()
+
+
+@contextmanager
+def savepoint(conn, name):
+    """Точка отката внутри транзакции: ошибка отменяет только изменения блока"""
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    else:
+        conn.execute(f"RELEASE {name}")
+
+
+def table_exists(conn, table_name):
+    """Есть ли таблица в БД"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+        (table_name,)
+    ).fetchone()
+    return row is not None
+
+
+def table_columns(conn, table_name):
+    """Список колонок таблицы"""
+    return [col[1] for col in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
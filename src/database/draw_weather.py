@@ -0,0 +1,183 @@
+"""
+Материализованная таблица draw_weather: одна строка погоды на тираж
+
+Для каждого тиража хранятся средние температура, влажность, давление и
+скорость ветра за местные сутки тиража, а также описание погоды и
+направление ветра ближайшего к тиражу замера. Рядом лежат маски полей,
+из этих строк строится погодный куб фильтров Felix Pila.
+Таблица обновляется инкрементально: при сохранении тиражей и замеров погоды.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from src.database.meta import DRAWS_REWRITTEN, bump_counter, get_data_version
+from src.database.timestamps import local_day_bounds
+
+_AVERAGED = ['temperature', 'humidity', 'pressure_mmhg', 'wind_speed']
+
+# SQLite ограничивает число параметров в запросе
+_CHUNK = 500
+
+
+def create_draw_weather(conn):
+    """Таблица и индекс по времени тиража"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS draw_weather (
+            draw_id INTEGER PRIMARY KEY,
+            draw_number TEXT NOT NULL,
+            draw_ts INTEGER NOT NULL,
+            field_1_mask INTEGER,
+            field_2_mask INTEGER,
+            temperature REAL,
+            humidity REAL,
+            pressure_mmhg REAL,
+            wind_speed REAL,
+            wind_direction TEXT,
+            description TEXT,
+            observations INTEGER NOT NULL,
+            data_version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_draw_weather_draw_ts ON draw_weather(draw_ts)")
+
+
+def create_draw_weather_version_index(conn):
+    """Строки, измененные после версии данных N (догрузка DrawStore)"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_draw_weather_version ON draw_weather(data_version)")
+
+
+def _round_average(value):
+    """Среднее до целого, половина - от нуля, как ROUND() в SQLite.
+
+    round() в Python округляет половину к четному (2.5 -> 2), из-за чего
+    фильтры по диапазонам расходились с прежним ROUND(AVG()) в SQL. Сначала
+    отбрасывается погрешность префиксных сумм (2.4999999999 -> 2.5).
+    """
+    return int(Decimal(repr(round(value, 6))).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _load_draws(conn, draw_ids):
+    sql = '''
+        SELECT id, draw_number, draw_ts, field_1_mask, field_2_mask
+        FROM lottery_results
+        WHERE draw_ts IS NOT NULL
+    '''
+    if draw_ids is None:
+        return conn.execute(sql).fetchall()
+
+    draw_ids = list(draw_ids)
+    rows = []
+    for i in range(0, len(draw_ids), _CHUNK):
+        chunk = draw_ids[i:i + _CHUNK]
+        rows.extend(conn.execute(
+            sql + f" AND id IN ({','.join('?' * len(chunk))})", chunk
+        ).fetchall())
+    return rows
+
+
+def refresh_draw_weather(conn, draw_ids=None):
+    """Пересчитывает строки draw_weather (для списка тиражей или для всех).
+
+    Замеры за нужный период грузятся одним диапазонным запросом по
+    weather_history(ts_epoch), средние за сутки считаются через
+    префиксные суммы, ближайший замер - через searchsorted.
+    Строки помечаются текущей data_version, поэтому писатель увеличивает
+    версию до вызова (в той же транзакции).
+    """
+    draws = _load_draws(conn, draw_ids)
+    if not draws:
+        return 0
+
+    draw_ts = np.array([row['draw_ts'] for row in draws], dtype=np.int64)
+    bounds = np.array([local_day_bounds(ts) for ts in draw_ts], dtype=np.int64).reshape(-1, 2)
+    day_start, day_end = bounds[:, 0], bounds[:, 1]
+
+    weather = conn.execute('''
+        SELECT ts_epoch, temperature, humidity, pressure_mmhg, wind_speed,
+               wind_direction, weather_description
+        FROM weather_history
+        WHERE ts_epoch >= ? AND ts_epoch < ?
+        ORDER BY ts_epoch
+    ''', (int(day_start.min()), int(day_end.max()))).fetchall()
+
+    weather_ts = np.array([row['ts_epoch'] for row in weather], dtype=np.int64)
+    lo = np.searchsorted(weather_ts, day_start, side='left')
+    hi = np.searchsorted(weather_ts, day_end, side='left')
+    observations = hi - lo
+
+    # Средние за сутки: префиксные суммы по каждой колонке (None не учитываются)
+    averages = {}
+    for column in _AVERAGED:
+        values = np.array([row[column] for row in weather], dtype=float)
+        valid = ~np.isnan(values)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(valid)])
+        n = counts[hi] - counts[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages[column] = np.where(n > 0, (sums[hi] - sums[lo]) / np.maximum(n, 1), np.nan)
+
+    # Ближайший к тиражу замер внутри его суток
+    nearest = np.zeros(len(draws), dtype=np.int64)
+    if len(weather_ts):
+        right = np.searchsorted(weather_ts, draw_ts)
+        left = np.clip(right - 1, lo, np.maximum(hi - 1, lo))
+        right = np.clip(right, lo, np.maximum(hi - 1, lo))
+        left = np.clip(left, 0, len(weather_ts) - 1)
+        right = np.clip(right, 0, len(weather_ts) - 1)
+        use_right = np.abs(weather_ts[right] - draw_ts) < np.abs(draw_ts - weather_ts[left])
+        nearest = np.where(use_right, right, left)
+
+    version = get_data_version(conn)
+    upserts = []
+    empty = []
+    for i, draw in enumerate(draws):
+        if observations[i] == 0:
+            empty.append(draw['id'])
+            continue
+
+        closest = weather[int(nearest[i])]
+        averaged = [
+            None if np.isnan(averages[column][i]) else _round_average(float(averages[column][i]))
+            for column in _AVERAGED
+        ]
+        upserts.append((
+            draw['id'], draw['draw_number'], draw['draw_ts'],
+            draw['field_1_mask'], draw['field_2_mask'],
+            *averaged,
+            closest['wind_direction'], closest['weather_description'],
+            int(observations[i]), version
+        ))
+
+    conn.executemany('''
+        INSERT OR REPLACE INTO draw_weather
+        (draw_id, draw_number, draw_ts, field_1_mask, field_2_mask,
+         temperature, humidity, pressure_mmhg, wind_speed,
+         wind_direction, description, observations, data_version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', upserts)
+
+    # Тиражи без погоды за сутки в таблице не держим
+    before = conn.total_changes
+    conn.executemany("DELETE FROM draw_weather WHERE draw_id = ?", [(draw_id,) for draw_id in empty])
+    if conn.total_changes != before:
+        # Удаление строк догрузкой по версии не увидеть
+        bump_counter(conn, DRAWS_REWRITTEN)
+
+    return len(upserts)
+
+
+def refresh_draw_weather_for_ts(conn, ts_epoch):
+    """Новый замер погоды меняет средние у тиражей тех же местных суток"""
+    if ts_epoch is None:
+        return 0
+
+    draw_ids = [row[0] for row in conn.execute(
+        "SELECT id FROM lottery_results WHERE draw_ts >= ? AND draw_ts < ?",
+        local_day_bounds(ts_epoch)
+    )]
+    if not draw_ids:
+        return 0
+    return refresh_draw_weather(conn, draw_ids)
+
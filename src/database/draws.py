@@ -0,0 +1,204 @@
+"""
+Запись тиражей в БД: строка lottery_results плюс нормализованные номера
+"""
+
+import json
+
+from src.analysis.bitmask import numbers_to_mask
+from src.database.db import get_connection
+from src.database.meta import DRAWS_REWRITTEN, bump_counter
+from src.database.number_stats import apply_draw
+from src.database.timestamps import parse_draw_ts
+
+
+def parse_field(value):
+    """Числа поля из JSON-строки или списка"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return [int(n) for n in value]
+
+
+def write_draw_numbers(conn, draw_id, field_1, field_2):
+    """Перезаписывает строки draw_numbers для одного тиража"""
+    conn.execute("DELETE FROM draw_numbers WHERE draw_id = ?", (draw_id,))
+    conn.executemany(
+        "INSERT INTO draw_numbers (draw_id, field, position, number) VALUES (?, ?, ?, ?)",
+        [(draw_id, 1, position, number) for position, number in enumerate(field_1, 1)] +
+        [(draw_id, 2, position, number) for position, number in enumerate(field_2, 1)]
+    )
+
+
+def read_draw_numbers(conn, draw_id):
+    """(числа поля 1, числа поля 2) тиража из draw_numbers"""
+    fields = ([], [])
+    for field, number in conn.execute(
+        "SELECT field, number FROM draw_numbers WHERE draw_id = ? ORDER BY field, position", (draw_id,)
+    ):
+        fields[field - 1].append(number)
+    return fields
+
+
+def write_draw_masks(conn, draw_id, field_1, field_2):
+    """Записывает 20-битные маски полей тиража"""
+    conn.execute(
+        "UPDATE lottery_results SET field_1_mask = ?, field_2_mask = ? WHERE id = ?",
+        (numbers_to_mask(field_1), numbers_to_mask(field_2), draw_id)
+    )
+
+
+def save_draw(conn, item):
+    """Сохраняет тираж (insert или update по draw_number): (id, изменился ли).
+
+    В отличие от INSERT OR REPLACE строка сохраняет свой id и уже привязанную
+    погоду, поэтому ссылки из draw_numbers остаются валидными.
+    Тираж, который уже записан с теми же датой, временем и числами, не
+    перезаписывается - повторный сбор той же страницы ничего не меняет.
+    Если у существующего тиража поменялись числа или время, увеличивается
+    счетчик draws_rewritten (кэши в памяти перезагружаются целиком).
+    Агрегат number_stats обновляется в той же транзакции.
+    """
+    field_1 = parse_field(item['field_1'])
+    field_2 = parse_field(item['field_2'])
+    draw_ts = parse_draw_ts(item['date'], item['time'])
+    field_1_mask = numbers_to_mask(field_1)
+    field_2_mask = numbers_to_mask(field_2)
+
+    existing = conn.execute(
+        """SELECT id, date, time, field_1, field_2, draw_ts, field_1_mask, field_2_mask
+           FROM lottery_results WHERE draw_number = ?""",
+        (item['draw_number'],)
+    ).fetchone()
+    previous = None
+    if existing:
+        if (existing['date'], existing['time'], parse_field(existing['field_1']), parse_field(existing['field_2'])) \
+                == (item['date'], item['time'], field_1, field_2):
+            return existing['id'], False
+        if (existing['draw_ts'], existing['field_1_mask'], existing['field_2_mask']) \
+                != (draw_ts, field_1_mask, field_2_mask):
+            bump_counter(conn, DRAWS_REWRITTEN)
+        previous = (existing['draw_ts'], *read_draw_numbers(conn, existing['id']))
+
+    conn.execute('''
+        INSERT INTO lottery_results
+        (draw_number, date, time, draw_ts, field_1, field_2, field_1_mask, field_2_mask, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(draw_number) DO UPDATE SET
+            date = excluded.date,
+            time = excluded.time,
+            draw_ts = excluded.draw_ts,
+            field_1 = excluded.field_1,
+            field_2 = excluded.field_2,
+            field_1_mask = excluded.field_1_mask,
+            field_2_mask = excluded.field_2_mask,
+            created_at = excluded.created_at
+    ''', (
+        item['draw_number'],
+        item['date'],
+        item['time'],
+        draw_ts,
+        json.dumps(field_1),
+        json.dumps(field_2),
+        field_1_mask,
+        field_2_mask,
+        item['created_at']
+    ))
+
+    draw_id = conn.execute(
+        "SELECT id FROM lottery_results WHERE draw_number = ?",
+        (item['draw_number'],)
+    ).fetchone()[0]
+
+    write_draw_numbers(conn, draw_id, field_1, field_2)
+    apply_draw(conn, item['draw_number'], draw_ts, field_1, field_2, previous)
+    return draw_id, True
+
+
+# Поля ответа /api/lottery/data -> колонка lottery_results
+DRAW_FIELDS = {
+    'tirage': 'draw_number',
+    'date': 'date',
+    'time': 'time',
+    'draw_ts': 'draw_ts',
+    'field_1': 'field_1',
+    'field_2': 'field_2',
+    'temperature': 'temperature',
+    'weather': 'weather',
+    'pressure': 'pressure',
+    'created_at': 'created_at',
+    'added_at': 'created_at',
+}
+
+
+def parse_cursor(cursor):
+    """'draw_ts:draw_number' -> (draw_ts, номер тиража числом); ValueError при ошибке"""
+    draw_ts, _, draw_number = cursor.partition(':')
+    if not draw_number:
+        raise ValueError(f"некорректный cursor: {cursor}")
+    return int(draw_ts), int(draw_number)
+
+
+def make_cursor(draw_ts, draw_number):
+    return f"{draw_ts}:{draw_number}"
+
+
+def draw_to_dict(row, fields):
+    """Строка lottery_results -> словарь ответа (JSON полей разбирается только для запрошенных)"""
+    item = {}
+    for field in fields:
+        value = row[DRAW_FIELDS[field]]
+        if field in ('field_1', 'field_2'):
+            value = parse_field(value)
+        elif field in ('date', 'time', 'weather'):
+            value = value or ''
+        item[field] = value
+    return item
+
+
+def fetch_draws_page(conn, limit, cursor=None, fields=None):
+    """Страница тиражей от новых к старым по индексу (draw_ts, номер тиража).
+
+    Keyset-пагинация: cursor - последний тираж предыдущей страницы, поэтому
+    запрос не зависит от глубины страницы. Возвращает (строки, next_cursor).
+    Тиражи без draw_ts (дата не разобрана) в выдачу не попадают. Номер
+    хранится текстом и сравнивается как число - по выражению построен
+    индекс idx_lottery_results_draw_order.
+    """
+    fields = fields or list(DRAW_FIELDS)
+    columns = sorted({DRAW_FIELDS[field] for field in fields} | {'draw_ts', 'draw_number'})
+
+    sql = f"SELECT {', '.join(columns)} FROM lottery_results WHERE draw_ts IS NOT NULL"
+    params = []
+    if cursor:
+        sql += " AND (draw_ts, CAST(draw_number AS INTEGER)) < (?, ?)"
+        params.extend(parse_cursor(cursor))
+    sql += " ORDER BY draw_ts DESC, CAST(draw_number AS INTEGER) DESC LIMIT ?"
+    # Одна лишняя строка показывает, есть ли следующая страница
+    params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = make_cursor(rows[-1]['draw_ts'], rows[-1]['draw_number'])
+
+    return [draw_to_dict(row, fields) for row in rows], next_cursor
+
+
+def iter_draws(batch_size, fields=None):
+    """Все тиражи от новых к старым пачками по batch_size.
+
+    Каждая пачка - отдельный keyset-запрос с коротким соединением из пула,
+    поэтому длинная выгрузка не держит открытую читающую транзакцию.
+    """
+    cursor = None
+    while True:
+        with get_connection() as conn:
+            page, cursor = fetch_draws_page(conn, batch_size, cursor, fields)
+        yield from page
+        if cursor is None:
+            break
@@ -0,0 +1,79 @@
+"""
+Служебные счетчики в таблице app_meta
+
+data_version увеличивается каждой записью (парсер, погода, привязка),
+по нему кэши и DrawStore понимают, что данные изменились.
+draws_rewritten увеличивается, когда у уже сохраненного тиража поменялись
+числа или время - инкрементальной догрузки тогда недостаточно.
+draw_count и weather_count - число строк таблиц, их ведут триггеры, поэтому
+/api/health не делает COUNT(*) при любом способе записи.
+"""
+
+import sqlite3
+
+DATA_VERSION = 'data_version'
+DRAWS_REWRITTEN = 'draws_rewritten'
+DRAW_COUNT = 'draw_count'
+WEATHER_COUNT = 'weather_count'
+
+# Таблица -> счетчик ее строк
+ROW_COUNTERS = {
+    'lottery_results': DRAW_COUNT,
+    'weather_history': WEATHER_COUNT,
+}
+
+
+def create_meta(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+def get_counter(conn, key):
+    """Значение счетчика (0, если таблицы или ключа еще нет)"""
+    try:
+        row = conn.execute("SELECT value FROM app_meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def bump_counter(conn, key):
+    """Увеличивает счетчик в текущей транзакции и возвращает новое значение"""
+    conn.execute('''
+        INSERT INTO app_meta (key, value) VALUES (?, 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1
+    ''', (key,))
+    return get_counter(conn, key)
+
+
+def get_data_version(conn):
+    return get_counter(conn, DATA_VERSION)
+
+
+def bump_data_version(conn):
+    return bump_counter(conn, DATA_VERSION)
+
+
+def create_row_counters(conn):
+    """Счетчики строк по текущему COUNT(*) и триггеры, которые их ведут"""
+    for table, key in ROW_COUNTERS.items():
+        conn.execute(
+            f"INSERT OR REPLACE INTO app_meta (key, value) VALUES (?, (SELECT COUNT(*) FROM {table}))", (key,)
+        )
+        # UPSERT, попавший в DO UPDATE, INSERT-триггер не вызывает
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE app_meta SET value = value + 1 WHERE key = '{key}';
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE app_meta SET value = value - 1 WHERE key = '{key}';
+            END
+        ''')
@@ -0,0 +1,221 @@
+"""
+Версионированные миграции схемы SQLite
+
+Текущая версия схемы хранится в PRAGMA user_version. Каждая миграция
+выполняется один раз, в транзакции, вместе с переносом исторических данных.
+"""
+
+import threading
+
+from src.database.db import get_db_path, transaction, table_columns
+from src.database.draw_weather import create_draw_weather, create_draw_weather_version_index, refresh_draw_weather
+from src.database.draws import parse_field, write_draw_masks, write_draw_numbers
+from src.database.meta import bump_data_version, create_meta, create_row_counters
+from src.database.models import create_tables
+from src.database.number_stats import create_number_stats, rebuild_number_stats
+from src.database.timestamps import parse_draw_ts, parse_weather_ts
+
+
+def _migration_draw_numbers(conn):
+    """Нормализованная таблица номеров тиражей + перенос истории из JSON"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS draw_numbers (
+            draw_id INTEGER NOT NULL,
+            field INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            number INTEGER NOT NULL,
+            PRIMARY KEY (draw_id, field, position)
+        ) WITHOUT ROWID
+    ''')
+    # "Тиражи с числом N" и частоты по полям - индексные сканы
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_draw_numbers_number ON draw_numbers(number, field, draw_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_draw_numbers_field ON draw_numbers(field, number, draw_id)")
+
+    columns = table_columns(conn, 'lottery_results')
+    if 'field_1' in columns and 'field_2' in columns:
+        rows = conn.execute("SELECT id, field_1, field_2 FROM lottery_results").fetchall()
+        for draw_id, field_1, field_2 in rows:
+            write_draw_numbers(conn, draw_id, parse_field(field_1), parse_field(field_2))
+    elif 'numbers' in columns:
+        # Старая структура: 8 чисел одним списком
+        rows = conn.execute("SELECT id, numbers FROM lottery_results").fetchall()
+        for draw_id, numbers in rows:
+            numbers = parse_field(numbers)
+            write_draw_numbers(conn, draw_id, numbers[:4], numbers[4:8])
+    else:
+        rows = []
+
+    print(f"🔧 draw_numbers: перенесено тиражей {len(rows)}")
+
+
+def _add_column(conn, table_name, column, definition):
+    """ALTER TABLE ADD COLUMN, если колонки еще нет"""
+    if column not in table_columns(conn, table_name):
+        conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {definition}")
+
+
+def _migration_field_masks(conn):
+    """Колонки field_1_mask / field_2_mask (20-битные маски полей) + перенос истории"""
+    _add_column(conn, 'lottery_results', 'field_1_mask', 'INTEGER')
+    _add_column(conn, 'lottery_results', 'field_2_mask', 'INTEGER')
+
+    # Маски собираем из уже нормализованных номеров
+    rows = conn.execute('''
+        SELECT draw_id, field, number FROM draw_numbers ORDER BY draw_id
+    ''').fetchall()
+
+    fields = {}
+    for draw_id, field, number in rows:
+        fields.setdefault(draw_id, ([], []))[field - 1].append(number)
+
+    for draw_id, (field_1, field_2) in fields.items():
+        write_draw_masks(conn, draw_id, field_1, field_2)
+
+    print(f"🔧 field_masks: перенесено тиражей {len(fields)}")
+
+
+def _migration_epoch_timestamps(conn):
+    """draw_ts у тиражей и ts_epoch у погоды (UTC epoch) с индексами + перенос истории"""
+    _add_column(conn, 'lottery_results', 'draw_ts', 'INTEGER')
+    _add_column(conn, 'weather_history', 'ts_epoch', 'INTEGER')
+
+    draws = conn.execute("SELECT id, date, time FROM lottery_results").fetchall()
+    conn.executemany(
+        "UPDATE lottery_results SET draw_ts = ? WHERE id = ?",
+        [(parse_draw_ts(date, time), draw_id) for draw_id, date, time in draws]
+    )
+
+    weather = conn.execute("SELECT id, timestamp FROM weather_history").fetchall()
+    conn.executemany(
+        "UPDATE weather_history SET ts_epoch = ? WHERE id = ?",
+        [(parse_weather_ts(timestamp), weather_id) for weather_id, timestamp in weather]
+    )
+
+    # Хронологический порядок тиражей и диапазонный join с погодой
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lottery_results_draw_ts ON lottery_results(draw_ts, draw_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_weather_history_ts ON weather_history(ts_epoch)")
+
+    print(f"🔧 epoch: тиражей {len(draws)}, замеров погоды {len(weather)}")
+
+
+def _migration_weather_attribution(conn):
+    """Колонки привязки тиража к ближайшему замеру погоды"""
+    _add_column(conn, 'lottery_results', 'weather_id', 'INTEGER')
+    _add_column(conn, 'lottery_results', 'weather_delta', 'INTEGER')
+
+    # Частичный индекс ровно по тиражам, ожидающим привязки
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_lottery_results_unattributed
+        ON lottery_results(draw_ts) WHERE weather_id IS NULL
+    ''')
+
+
+def _migration_draw_weather(conn):
+    """Материализованная таблица тираж x погода + заполнение по истории"""
+    create_draw_weather(conn)
+    count = refresh_draw_weather(conn)
+    print(f"🔧 draw_weather: тиражей с погодой {count}")
+
+
+def _migration_data_version(conn):
+    """Таблица app_meta со счетчиком data_version + версия строк draw_weather"""
+    create_meta(conn)
+    _add_column(conn, 'draw_weather', 'data_version', 'INTEGER NOT NULL DEFAULT 0')
+    create_draw_weather_version_index(conn)
+
+
+def _migration_number_stats(conn):
+    """Агрегат частот чисел number_stats + заполнение по истории"""
+    create_number_stats(conn)
+    count = rebuild_number_stats(conn)
+    print(f"🔧 number_stats: чисел по полям {count}")
+
+
+def _migration_weather_version(conn):
+    """Версия данных, в которой у тиража последний раз менялась привязка погоды"""
+    _add_column(conn, 'lottery_results', 'weather_version', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lottery_results_weather_version ON lottery_results(weather_version)")
+
+
+def _migration_row_counters(conn):
+    """Число строк тиражей и погоды в app_meta (ведут триггеры)"""
+    create_meta(conn)
+    create_row_counters(conn)
+
+
+def _migration_numeric_draw_order(conn):
+    """Порядок тиражей по номеру как числу: draw_number - TEXT, и '9' > '10'"""
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_lottery_results_draw_order
+        ON lottery_results(draw_ts, CAST(draw_number AS INTEGER))
+    ''')
+    # Индекс по текстовому номеру больше не используется
+    conn.execute("DROP INDEX IF EXISTS idx_lottery_results_draw_ts")
+    # last_draw при равном draw_ts мог быть выбран по текстовому сравнению
+    rebuild_number_stats(conn)
+
+
+def _migration_draw_weather_local_days(conn):
+    """Пересчет draw_weather: сутки по смещению на дату тиража, округление как ROUND()"""
+    bump_data_version(conn)
+    count = refresh_draw_weather(conn)
+    print(f"🔧 draw_weather: пересчитано тиражей {count}")
+
+
+def _migration_drop_draw_weather_filter_indexes(conn):
+    """Индексы фильтров draw_weather не нужны: фильтры считает погодный куб"""
+    for column in ['temperature', 'humidity', 'pressure_mmhg', 'wind_speed', 'wind_direction', 'description']:
+        conn.execute(f"DROP INDEX IF EXISTS idx_draw_weather_{column}")
+
+
+# (версия, описание, функция) - только добавлять в конец
+MIGRATIONS = [
+    (1, 'таблица draw_numbers', _migration_draw_numbers),
+    (2, 'битовые маски полей', _migration_field_masks),
+    (3, 'epoch-время тиражей и погоды', _migration_epoch_timestamps),
+    (4, 'привязка погоды к тиражам', _migration_weather_attribution),
+    (5, 'таблица draw_weather', _migration_draw_weather),
+    (6, 'счетчик версии данных', _migration_data_version),
+    (7, 'агрегат number_stats', _migration_number_stats),
+    (8, 'версия привязки погоды', _migration_weather_version),
+    (9, 'счетчики строк для /api/health', _migration_row_counters),
+    (10, 'числовой порядок номеров тиражей', _migration_numeric_draw_order),
+    (11, 'местные сутки и округление в draw_weather', _migration_draw_weather_local_days),
+    (12, 'без индексов фильтров draw_weather', _migration_drop_draw_weather_filter_indexes),
+]
+
+_ready_paths = set()
+_schema_lock = threading.Lock()
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations():
+    """Создает базовые таблицы и применяет недостающие миграции"""
+    applied = []
+    with transaction() as conn:
+        create_tables(conn)
+        current = get_schema_version(conn)
+
+        for version, description, migration in MIGRATIONS:
+            if version <= current:
+                continue
+            print(f"🔧 Миграция {version}: {description}")
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            applied.append(version)
+
+    return applied
+
+
+def ensure_schema():
+    """Гарантирует актуальную схему (проверка выполняется один раз на процесс и БД)"""
+    db_path = get_db_path()
+    if db_path in _ready_paths:
+        return
+    with _schema_lock:
+        if db_path not in _ready_paths:
+            run_migrations()
+            _ready_paths.add(db_path)
@@ -0,0 +1,43 @@
+"""
+Схема таблиц SQLite, с которыми работают парсеры и API
+"""
+
+LOTTERY_RESULTS_DDL = '''
+CREATE TABLE IF NOT EXISTS lottery_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    draw_number TEXT UNIQUE NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    field_1 TEXT NOT NULL,
+    field_2 TEXT NOT NULL,
+    temperature REAL,
+    weather TEXT,
+    pressure REAL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+WEATHER_HISTORY_DDL = '''
+CREATE TABLE IF NOT EXISTS weather_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME NOT NULL,
+    temperature REAL NOT NULL,
+    feels_like REAL,
+    weather_description TEXT NOT NULL,
+    humidity INTEGER,
+    pressure_mmhg REAL,
+    pressure_hpa REAL,
+    wind_speed REAL,
+    wind_direction TEXT,
+    visibility INTEGER,
+    cloudiness INTEGER,
+    city TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+
+def create_tables(conn):
+    """Создает базовые таблицы, если их нет"""
+    conn.execute(LOTTERY_RESULTS_DDL)
+    conn.execute(WEATHER_HISTORY_DDL)
@@ -0,0 +1,122 @@
+"""
+Агрегат number_stats: по каждому числу и полю - сколько раз выпало,
+в каком тираже последний раз и когда (draw_ts)
+
+Обновляется в той же транзакции, что и запись тиража (save_draw), поэтому
+/api/lottery/statistics читает 40 строк вместо всех тиражей. Учитываются
+только тиражи с разобранным временем (draw_ts), как и в DrawStore. При
+равном draw_ts последним считается тираж с большим номером - номер
+хранится текстом, поэтому сравнивается как число ('9' < '10').
+"""
+
+
+def draw_order(draw_number):
+    """Номер тиража как число, как CAST(draw_number AS INTEGER) в SQLite"""
+    try:
+        return int(draw_number)
+    except (TypeError, ValueError):
+        return 0
+
+
+def create_number_stats(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS number_stats (
+            number INTEGER NOT NULL,
+            field INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_draw TEXT,
+            last_seen_ts INTEGER,
+            PRIMARY KEY (number, field)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _pairs(field_1, field_2):
+    return [(number, 1) for number in field_1] + [(number, 2) for number in field_2]
+
+
+def _recompute(conn, pairs):
+    """Пересчитывает строки (number, field) по draw_numbers"""
+    for number, field in pairs:
+        count = conn.execute('''
+            SELECT COUNT(*)
+            FROM draw_numbers dn JOIN lottery_results lr ON lr.id = dn.draw_id
+            WHERE dn.number = ? AND dn.field = ? AND lr.draw_ts IS NOT NULL
+        ''', (number, field)).fetchone()[0]
+
+        if not count:
+            conn.execute("DELETE FROM number_stats WHERE number = ? AND field = ?", (number, field))
+            continue
+
+        last_draw, last_seen_ts = conn.execute('''
+            SELECT lr.draw_number, lr.draw_ts
+            FROM draw_numbers dn JOIN lottery_results lr ON lr.id = dn.draw_id
+            WHERE dn.number = ? AND dn.field = ? AND lr.draw_ts IS NOT NULL
+            ORDER BY lr.draw_ts DESC, CAST(lr.draw_number AS INTEGER) DESC
+            LIMIT 1
+        ''', (number, field)).fetchone()
+
+        conn.execute('''
+            INSERT OR REPLACE INTO number_stats (number, field, count, last_draw, last_seen_ts)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (number, field, count, last_draw, last_seen_ts))
+
+
+def apply_draw(conn, draw_number, draw_ts, field_1, field_2, previous=None):
+    """Учитывает сохраненный тираж в number_stats.
+
+    previous - (draw_ts, field_1, field_2) тиража до перезаписи или None
+    для нового. Новый тираж - инкремент счетчиков; перезаписанный -
+    пересчет затронутых чисел (это редкость, поэтому без хитростей).
+    """
+    new_pairs = _pairs(field_1, field_2) if draw_ts is not None else []
+
+    if previous is None:
+        conn.executemany('''
+            INSERT INTO number_stats (number, field, count, last_draw, last_seen_ts)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT(number, field) DO UPDATE SET
+                count = count + 1,
+                last_draw = CASE
+                    WHEN last_seen_ts IS NULL
+                      OR excluded.last_seen_ts > last_seen_ts
+                      OR (excluded.last_seen_ts = last_seen_ts
+                          AND CAST(excluded.last_draw AS INTEGER) > CAST(last_draw AS INTEGER))
+                    THEN excluded.last_draw ELSE last_draw END,
+                last_seen_ts = MAX(COALESCE(last_seen_ts, excluded.last_seen_ts), excluded.last_seen_ts)
+        ''', [(number, field, draw_number, draw_ts) for number, field in new_pairs])
+        return
+
+    old_ts, old_1, old_2 = previous
+    old_pairs = _pairs(old_1, old_2) if old_ts is not None else []
+    if old_ts == draw_ts and sorted(old_pairs) == sorted(new_pairs):
+        return
+
+    _recompute(conn, sorted(set(old_pairs) | set(new_pairs)))
+
+
+def rebuild_number_stats(conn):
+    """Полный пересчет агрегата по draw_numbers"""
+    conn.execute("DELETE FROM number_stats")
+    pairs = conn.execute("SELECT DISTINCT number, field FROM draw_numbers").fetchall()
+    _recompute(conn, [tuple(pair) for pair in pairs])
+    return len(pairs)
+
+
+def read_number_stats(conn):
+    """{число: {'count', 'field_1', 'field_2', 'last_draw', 'last_seen_ts'}} по обоим полям"""
+    stats = {}
+    for number, field, count, last_draw, last_seen_ts in conn.execute(
+        "SELECT number, field, count, last_draw, last_seen_ts FROM number_stats"
+    ):
+        item = stats.setdefault(number, {
+            'count': 0, 'field_1': 0, 'field_2': 0, 'last_draw': None, 'last_seen_ts': None
+        })
+        item['count'] += count
+        item[f'field_{field}'] = count
+        if item['last_seen_ts'] is None or (
+            (last_seen_ts, draw_order(last_draw)) > (item['last_seen_ts'], draw_order(item['last_draw']))
+        ):
+            item['last_draw'] = last_draw
+            item['last_seen_ts'] = last_seen_ts
+    return stats
@@ -0,0 +1,50 @@
+"""
+Нормализация дат тиражей и замеров погоды в UTC epoch (целые секунды)
+"""
+
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from config import Config
+
+DAY_SECONDS = 86400
+
+_tz = ZoneInfo(Config.TIMEZONE)
+
+
+def parse_draw_ts(date_str, time_str):
+    """'2.1.2026', '22:00' -> UTC epoch (или None, если дата не разбирается)"""
+    try:
+        local = datetime.strptime(f"{date_str.strip()} {time_str.strip()}", "%d.%m.%Y %H:%M")
+    except (AttributeError, ValueError):
+        return None
+    return int(local.replace(tzinfo=_tz).timestamp())
+
+
+def parse_weather_ts(timestamp):
+    """ISO-время замера погоды -> UTC epoch.
+
+    Время без часового пояса (datetime.now().isoformat()) считается местным.
+    """
+    if not timestamp:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(timestamp).strip())
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=_tz)
+    return int(moment.timestamp())
+
+
+def local_day_bounds(ts):
+    """(начало, конец) местных суток с моментом ts, UTC epoch.
+
+    Смещение от UTC берется на эту дату, а не текущее: для истории до
+    отмены перехода на летнее время сутки сдвинуты, а бывают и 23/25 часов.
+    """
+    day = datetime.fromtimestamp(int(ts), _tz).date()
+    start = datetime.combine(day, time(), tzinfo=_tz)
+    end = datetime.combine(day + timedelta(days=1), time(), tzinfo=_tz)
+    return int(start.timestamp()), int(end.timestamp())
+
@@ -0,0 +1,255 @@
+"""
+Долгоживущий браузер Playwright для парсеров
+
+Раньше каждый сбор запускал новый Chromium. Менеджер держит один процесс
+браузера и пул контекстов в отдельном потоке со своим asyncio-циклом;
+синхронный код (очередь задач, планировщик) отдает туда корутину и ждет
+результат. Перед каждым сбором браузер проверяется, упавший или
+отключившийся перезапускается. Время этапов (запуск, контекст, страница
+и этапы самого парсера) копится в stats() для /api/health.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from config import Config
+
+
+async def _launch_chromium():
+    """(playwright, browser) - запуск по умолчанию"""
+    from playwright.async_api import async_playwright
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(headless=True)
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+
+class StageTimer:
+    """Суммарное и последнее время этапов в секундах"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {'count': 0, 'total': 0.0, 'last': 0.0})
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['last'] = seconds
+
+    @asynccontextmanager
+    async def measure(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def stats(self):
+        with self._lock:
+            return {
+                stage: {'count': entry['count'],
+                        'last': round(entry['last'], 3),
+                        'avg': round(entry['total'] / entry['count'], 3)}
+                for stage, entry in self._stages.items()
+            }
+
+
+class BrowserManager:
+    """Один браузер + пул контекстов в фоновом asyncio-цикле.
+
+    launch - корутина без аргументов, возвращающая (playwright, browser);
+    по умолчанию headless Chromium.
+    """
+
+    def __init__(self, pool_size=None, context_max_uses=None, launch=None):
+        self.pool_size = pool_size or Config.BROWSER_POOL_SIZE
+        self.context_max_uses = context_max_uses or Config.BROWSER_CONTEXT_MAX_USES
+        self._launch = launch or _launch_chromium
+        self.timer = StageTimer()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._slots = None
+        self._idle = []
+        self._uses = {}
+        self._stats = {'launches': 0, 'restarts': 0, 'runs': 0, 'errors': 0, 'cancelled': 0,
+                       'contexts_created': 0}
+        self.last_error = None
+
+    # ---------- поток цикла ----------
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._loop
+            self._loop = asyncio.new_event_loop()
+            self._browser_lock = None
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                # Примитивы asyncio создаются внутри своего цикла
+                self._browser_lock = asyncio.Lock()
+                self._slots = asyncio.Semaphore(self.pool_size)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name='browser-loop', daemon=True)
+            self._thread.start()
+            ready.wait()
+            return self._loop
+
+    def run(self, work, timeout=None):
+        """Выполняет await work(page) в общем браузере и возвращает результат"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._run(work), loop)
+        try:
+            return future.result(timeout or Config.BROWSER_RUN_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # Иначе сбор продолжится в цикле браузера и будет держать страницу,
+            # пока вызывающий код уже перешел к запасному варианту
+            future.cancel()
+            raise
+
+    # ---------- браузер ----------
+
+    def _healthy(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self._healthy():
+                return self._browser
+            restart = self._browser is not None
+            await self._close_browser()
+            async with self.timer.measure('launch'):
+                self._playwright, self._browser = await self._launch()
+            self._stats['launches'] += 1
+            if restart:
+                self._stats['restarts'] += 1
+                print("🔁 Браузер перезапущен")
+            else:
+                print("🌐 Браузер запущен")
+            return self._browser
+
+    async def _close_browser(self):
+        """Закрывает браузер и контексты, ошибки упавшего процесса не важны"""
+        self._idle.clear()
+        self._uses.clear()
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._playwright = None
+        for closer in (browser and browser.close, playwright and playwright.stop):
+            if closer is None:
+                continue
+            try:
+                await closer()
+            except Exception:
+                pass
+
+    async def _acquire_context(self, browser):
+        while self._idle:
+            context = self._idle.pop()
+            if context.browser is browser:
+                return context
+        async with self.timer.measure('context'):
+            context = await browser.new_context()
+        self._stats['contexts_created'] += 1
+        self._uses[id(context)] = 0
+        return context
+
+    async def _release_context(self, context, browser, failed):
+        uses = self._uses.get(id(context), 0) + 1
+        self._uses[id(context)] = uses
+        # Контекст после ошибки или долгой работы не переиспользуем
+        if failed or uses >= self.context_max_uses or browser is not self._browser:
+            self._uses.pop(id(context), None)
+            try:
+                await context.close()
+            except Exception:
+                pass
+            return
+        self._idle.append(context)
+
+    async def _run(self, work):
+        async with self._slots:
+            browser = await self._ensure_browser()
+            context = await self._acquire_context(browser)
+            failed = False
+            try:
+                async with self.timer.measure('page'):
+                    page = await context.new_page()
+                try:
+                    result = await work(page)
+                finally:
+                    await page.close()
+                self._stats['runs'] += 1
+                return result
+            except asyncio.CancelledError:
+                # Отмена по таймауту run(): контекст после прерванного сбора не переиспользуем
+                failed = True
+                self._stats['cancelled'] += 1
+                raise
+            except Exception as e:
+                failed = True
+                self._stats['errors'] += 1
+                self.last_error = str(e)
+                # Упавший браузер перезапустится перед следующим сбором
+                if not self._healthy():
+                    print(f"⚠️ Браузер недоступен: {e}")
+                raise
+            finally:
+                await self._release_context(context, browser, failed)
+
+    # ---------- обслуживание ----------
+
+    def shutdown(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+        if thread is None or not thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(30)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    def stats(self):
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'connected': self._healthy(),
+            'pool_size': self.pool_size,
+            'idle_contexts': len(self._idle),
+            **self._stats,
+            'last_error': self.last_error,
+            'timings': self.timer.stats()
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_browser_manager():
+    """Общий на процесс менеджер браузера (поток цикла стартует при первом сборе)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = BrowserManager()
+            # Chromium - дочерний процесс, при выходе закрываем его явно
+            atexit.register(_manager.shutdown)
+        return _manager
+
+
+def browser_stats():
+    """Статистика для /api/health без создания менеджера"""
+    return _manager.stats() if _manager is not None else {'running': False}
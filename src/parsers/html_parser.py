@@ -0,0 +1,146 @@
+"""
+Быстрый парсер архива 4x20 без браузера
+
+Страница архива запрашивается общим requests.Session (пул соединений,
+повторы при сетевых ошибках), тиражи извлекаются BeautifulSoup по
+CSS-селекторам строк таблицы. Если в отданном сервером HTML строк нет
+(таблицу дорисовывает скрипт) или запрос не удался, run_http_parser
+возвращает None и run_parser_sync собирает данные через браузер.
+Бэкенд выбирается Config.LOTTERY_PARSER_BACKEND.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from src.parsers.browser_manager import StageTimer
+from src.parsers.lottery_parser import (COMB_SELECTOR, LINK_SELECTOR, ROW_SELECTOR, TITLE_SELECTOR,
+                                        CorrectLotteryParser)
+
+ARCHIVE_URL = "https://www.lotonews.ru/draws/archive/4x20"
+
+HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'ru-RU,ru;q=0.9'
+}
+
+DRAW_LINK_RE = re.compile(r'/draws/archive/4x20/(\d+)')
+DRAW_NUMBER_RE = re.compile(r'\b(\d{5})\b')
+DATE_TIME_RE = re.compile(r'(\d{1,2}\.\d{1,2}\.\d{4})\s+(\d{1,2}:\d{2})')
+NUMBER_RE = re.compile(r'\b\d{1,2}\b')
+
+_session = None
+_session_lock = threading.Lock()
+
+# Время этапов HTTP-сбора (fetch, extract, save) для /api/health
+timer = StageTimer()
+
+
+def get_session():
+    """Общая на процесс сессия: keep-alive и повторы при сбоях сети"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+
+def _row_numbers(container):
+    """(поле 1, поле 2) из контейнера комбинации; до черты - поле 1"""
+    text = container.get_text(' ', strip=True)
+    if '|' in text:
+        first, second = text.split('|', 1)
+        return ([int(n) for n in NUMBER_RE.findall(first)][:4],
+                [int(n) for n in NUMBER_RE.findall(second)][:4])
+    numbers = [int(n) for n in NUMBER_RE.findall(text)]
+    return numbers[:4], numbers[4:8]
+
+
+def extract_draws(html):
+    """Тиражи из HTML архива в формате _save_to_db (пустой список, если строк нет)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    draws = []
+    seen = set()
+
+    for row in soup.select(ROW_SELECTOR):
+        container = row.select_one(COMB_SELECTOR)
+        if container is None:
+            continue
+
+        link = row.select_one(LINK_SELECTOR)
+        match = DRAW_LINK_RE.search(link.get('href', '')) if link else None
+        title = row.select_one(TITLE_SELECTOR) or row
+        title_text = title.get_text(' ', strip=True)
+        if match is None:
+            match = DRAW_NUMBER_RE.search(title_text)
+        date_time = DATE_TIME_RE.search(title_text)
+        if match is None or date_time is None:
+            continue
+
+        draw_number = match.group(1)
+        field_1, field_2 = _row_numbers(container)
+        if draw_number in seen or len(field_1) != 4 or len(field_2) != 4:
+            continue
+        if not all(1 <= n <= 20 for n in field_1 + field_2):
+            continue
+        seen.add(draw_number)
+
+        draws.append({
+            'draw_number': draw_number,
+            'date': date_time.group(1),
+            'time': date_time.group(2),
+            'field_1': json.dumps(field_1),
+            'field_2': json.dumps(field_2),
+            'created_at': created_at
+        })
+
+    return draws
+
+
+def fetch_archive(url=ARCHIVE_URL):
+    """HTML страницы архива"""
+    response = get_session().get(url, timeout=Config.SCRAPER_HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def run_http_parser(progress=None):
+    """Сбор без браузера: число сохраненных записей или None, если нужен браузер"""
+    print("⚡ Сбор архива по HTTP...")
+    if progress:
+        progress('loading', 0.2)
+    started = time.perf_counter()
+    try:
+        html = fetch_archive()
+    except requests.RequestException as e:
+        print(f"⚠️ HTTP-сбор: {e}")
+        return None
+    timer.record('fetch', time.perf_counter() - started)
+
+    if progress:
+        progress('extracting', 0.6)
+    started = time.perf_counter()
+    draws = extract_draws(html)
+    timer.record('extract', time.perf_counter() - started)
+    if not draws:
+        print("⚠️ HTTP-сбор: в HTML нет строк тиражей")
+        return None
+
+    return CorrectLotteryParser().save(draws, progress, timer)
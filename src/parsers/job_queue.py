@@ -0,0 +1,187 @@
+"""
+Очередь задач парсера
+
+POST /api/run-parser и планировщик не запускают браузер сами, а ставят
+задачу в очередь и сразу получают ее id. Один фоновый поток выполняет
+задачи по одной, поэтому два Chromium одновременно не стартуют. Пока
+задача ждет или идет сбор, новые запросы получают ее же (повторный
+клик в админке и запуск по расписанию не создают дублей); запрос после
+сбора (погода, прогрев) ставит новую задачу. Ход задачи -
+этап, прогресс 0..1 и saved_count - читается по id.
+"""
+
+import itertools
+import queue
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+# Сколько завершенных задач помнить для /api/parser-jobs
+HISTORY_SIZE = 50
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ParserJob:
+    """Задача сбора: источник, этап, прогресс и результат"""
+
+    def __init__(self, job_id, source, with_weather=False):
+        self.id = job_id
+        self.source = source
+        self.with_weather = with_weather
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.progress = 0.0
+        self.saved_count = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.requests = 1
+        # Этап погоды уже выполнен (или начат) - повторно не запускается
+        self.weather_done = False
+
+    def update(self, stage, progress=None, **fields):
+        """Колбэк прогресса для парсера: этап, доля 0..1 и прочие поля"""
+        self.stage = stage
+        if progress is not None:
+            self.progress = round(max(self.progress, min(progress, 1.0)), 2)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'source': self.source,
+            'with_weather': self.with_weather,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'saved_count': self.saved_count,
+            'error': self.error,
+            'requests': self.requests,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ParserJobQueue:
+    """Один рабочий поток + дедупликация активной задачи.
+
+    runner(job) выполняет сбор и возвращает saved_count; этапы он
+    отмечает через job.update(). weather_runner(job) - сбор погоды для
+    задач с with_weather, on_finish(job) - действие после задачи (прогрев).
+    """
+
+    def __init__(self, runner, weather_runner=None, on_finish=None, history=HISTORY_SIZE):
+        self.runner = runner
+        self.weather_runner = weather_runner
+        self.on_finish = on_finish
+        self.history = history
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active = None
+        self._worker = None
+
+    def submit(self, source, with_weather=False):
+        """(задача, создана ли новая). Активная задача возвращается повторно."""
+        with self._lock:
+            job = self._active
+            if job is not None and job.active:
+                job.requests += 1
+                # Задача заодно соберет и погоду: ждущая - в свой черед,
+                # выполняющаяся - после сбора лотереи (если этап погоды
+                # еще не начат, иначе свежий замер уже есть)
+                if with_weather and not job.weather_done:
+                    job.with_weather = True
+                return job, False
+
+            job = ParserJob(f"{datetime.now():%Y%m%d%H%M%S}-{next(self._ids)}", source, with_weather)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            self._active = job
+            self._ensure_worker()
+        self._queue.put(job)
+        print(f"📥 Задача парсера {job.id} ({source}) в очереди")
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit=10):
+        """Последние задачи, новые первыми"""
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name='parser-jobs', daemon=True)
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            self._run(job)
+            self._queue.task_done()
+
+    def _release(self, job):
+        """Сбор лотереи закончен: новые запросы больше не сливаются с задачей.
+
+        Под той же блокировкой, что и submit(): запрос после этого момента
+        ставит новую задачу, а не теряется в завершающейся. Возвращает,
+        нужен ли этап погоды (with_weather пришел до конца сбора).
+        """
+        with self._lock:
+            if self._active is job:
+                self._active = None
+            if job.with_weather and not job.weather_done:
+                job.weather_done = True
+                return True
+            return False
+
+    def _set_status(self, job, status):
+        with self._lock:
+            job.status = status
+            if self._active is job:
+                self._active = None
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = datetime.now().isoformat()
+        job.update('starting', 0.0)
+        try:
+            job.saved_count = self.runner(job)
+            if self._release(job) and self.weather_runner is not None:
+                job.update('weather', 0.9)
+                self.weather_runner(job)
+            if self.on_finish is not None:
+                job.update('warm_up', 0.95)
+                self.on_finish(job)
+            self._set_status(job, DONE)
+            job.update(DONE, 1.0)
+        except Exception as e:
+            print(f"❌ Задача парсера {job.id}: {e}")
+            traceback.print_exc()
+            job.error = str(e)
+            job.stage = FAILED
+            self._set_status(job, FAILED)
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def join(self):
+        """Ждет выполнения всех поставленных задач (тесты, завершение)"""
+        self._queue.join()
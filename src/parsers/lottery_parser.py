@@ -1,327 +1,524 @@
-import asyncio
-import json
-import sqlite3
-from datetime import datetime
-from playwright.async_api import async_playwright
-
-class CorrectLotteryParser:
-    def __init__(self):
-        self.lottery_url = "https://www.lotonews.ru/draws/archive/4x20"
-        self.db_path = r'D:\VS_code\lotto-meteo-stats\data\lottery.db'
-        print(f"🎯 БД парсера: {self.db_path}")
-    
-    async def parse_and_save(self):
-        """Правильный парсинг структурированной таблицы"""
-        print("🔄 Запуск КОРРЕКТНОГО парсера...")
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            try:
-                await page.goto(self.lottery_url, wait_until="networkidle", timeout=60000)
-                await asyncio.sleep(3)
-                
-                # Прокручиваем чтобы загрузить все
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(2)
-                await page.evaluate('window.scrollTo(0, 0)')
-                await asyncio.sleep(1)
-                
-                # ПАРСИМ ПРАВИЛЬНО - используем структуру таблицы
-                data = await self._extract_correct_data(page)
-                
-                if data:
-                    print(f"✅ Найдено тиражей: {len(data)}")
-                    saved_count = self._save_to_db(data)
-                    print(f"💾 Сохранено: {saved_count} записей")
-                    return saved_count
-                return 0
-                    
-            except Exception as e:
-                print(f"💥 Ошибка: {e}")
-                import traceback
-                traceback.print_exc()
-                return 0
-            finally:
-                await browser.close()
-    
-    async def _extract_correct_data(self, page):
-        """Исправленный метод - парсим таблицу правильно"""
-        try:
-            data = await page.evaluate('''() => {
-                const results = [];
-                
-                // Ищем ВСЮ таблицу результатов
-                const table = document.querySelector('table');
-                if (!table) {
-                    console.log('Таблица не найдена, ищем div-таблицу');
-                    // Ищем div-таблицу
-                    const divTables = document.querySelectorAll('div[class*="table"], div[class*="archive"]');
-                    if (divTables.length > 0) {
-                        console.log('Найдена div-таблица');
-                    }
-                } else {
-                    console.log('Найдена HTML таблица');
-                }
-                
-                // ЛУЧШИЙ СПОСОБ: парсим по блокам тиражей
-                // Ищем все элементы, содержащие тиражи
-                const drawElements = document.querySelectorAll('[class*="draw"], [class*="tirazh"], tr, div[class*="row"]');
-                console.log('Найдено элементов тиражей:', drawElements.length);
-                
-                for (let i = 0; i < drawElements.length; i++) {
-                    const element = drawElements[i];
-                    const elementText = element.textContent.trim();
-                    
-                    // Проверяем что это тираж (есть номер тиража 5 цифр)
-                    const drawMatch = elementText.match(/\\b(\\d{5})\\b/);
-                    if (!drawMatch) continue;
-                    
-                    const drawNumber = drawMatch[1];
-                    
-                    // Ищем дату и время (формат: "2.1.2026 22:00")
-                    const dateTimeMatch = elementText.match(/(\\d{1,2}\\.\\d{1,2}\\.\\d{4})\\s+(\\d{1,2}:\\d{2})/);
-                    if (!dateTimeMatch) continue;
-                    
-                    const drawDate = dateTimeMatch[1];
-                    const drawTime = dateTimeMatch[2];
-                    
-                    console.log(`\\n🎰 Тираж ${drawNumber} от ${drawDate} ${drawTime}`);
-                    
-                    // ИЩЕМ ЧИСЛА ПРАВИЛЬНО - по структуре
-                    // Способ 1: Ищем блоки с числами в текущем элементе
-                    const numberBlocks = element.querySelectorAll('[class*="number"], [class*="ball"], [class*="comb"]');
-                    let numbers = [];
-                    
-                    if (numberBlocks.length > 0) {
-                        // Берем числа из специальных блоков
-                        numberBlocks.forEach(block => {
-                            const blockText = block.textContent.trim();
-                            const blockNumbers = blockText.match(/\\b\\d{1,2}\\b/g);
-                            if (blockNumbers) {
-                                blockNumbers.forEach(num => {
-                                    const n = parseInt(num, 10);
-                                    if (n >= 1 && n <= 20 && !numbers.includes(n)) {
-                                        numbers.push(n);
-                                    }
-                                });
-                            }
-                        });
-                    }
-                    
-                    // Способ 2: Если не нашли, парсим структурированно
-                    if (numbers.length < 8) {
-                        // Ищем вертикальные списки чисел (как на сайте)
-                        const allText = elementText;
-                        
-                        // Паттерн: 4 числа, потом |, потом 4 числа
-                        const pattern1 = /(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s*\\|\\s*(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})/;
-                        const match1 = pattern1.exec(allText);
-                        
-                        if (match1) {
-                            numbers = [];
-                            for (let j = 1; j <= 8; j++) {
-                                numbers.push(parseInt(match1[j], 10));
-                            }
-                        } else {
-                            // Паттерн для чисел в столбик
-                            const lines = allText.split(/\\n|\\r/);
-                            const potentialNumbers = [];
-                            
-                            for (const line of lines) {
-                                const trimmed = line.trim();
-                                const num = parseInt(trimmed, 10);
-                                if (!isNaN(num) && num >= 1 && num <= 20) {
-                                    potentialNumbers.push(num);
-                                }
-                            }
-                            
-                            // Ищем последовательность из 8 чисел
-                            for (let j = 0; j <= potentialNumbers.length - 8; j++) {
-                                const slice = potentialNumbers.slice(j, j + 8);
-                                // Проверяем что это действительно выигрышные числа (могут быть повторы в 4x20)
-                                if (slice.every(n => n >= 1 && n <= 20)) {
-                                    numbers = slice;
-                                    break;
-                                }
-                            }
-                        }
-                    }
-                    
-                    // Разделяем на 2 поля по 4 числа
-                    if (numbers.length >= 8) {
-                        const field_1 = numbers.slice(0, 4);
-                        const field_2 = numbers.slice(4, 8);
-                        
-                        console.log('Поле 1:', field_1);
-                        console.log('Поле 2:', field_2);
-                        
-                        results.push({
-                            draw_number: drawNumber,
-                            draw_date: drawDate,
-                            draw_time: drawTime,
-                            numbers: numbers,
-                            field_1: field_1,
-                            field_2: field_2
-                        });
-                    } else {
-                        console.log('Недостаточно чисел:', numbers);
-                    }
-                }
-                
-                console.log('Всего найдено тиражей:', results.length);
-                return results;
-            }''')
-            
-            # Обрабатываем полученные данные
-            if data:
-                print(f"\n📊 Получено {len(data)} записей")
-                processed = []
-                seen = set()
-                
-                for i, item in enumerate(data, 1):
-                    draw_num = str(item['draw_number']).strip()
-                    
-                    if draw_num and draw_num not in seen:
-                        seen.add(draw_num)
-                        
-                        # Проверяем что числа корректные
-                        field_1 = item.get('field_1', [])
-                        field_2 = item.get('field_2', [])
-                        
-                        if len(field_1) == 4 and len(field_2) == 4:
-                            processed.append({
-                                'draw_number': draw_num,
-                                'date': item['draw_date'],
-                                'time': item['draw_time'],
-                                'field_1': json.dumps(field_1),
-                                'field_2': json.dumps(field_2),
-                                'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                            
-                            print(f"✅ [{i}] Тираж {draw_num}: {item['draw_date']} {item['draw_time']}")
-                            print(f"   Поле 1: {field_1}")
-                            print(f"   Поле 2: {field_2}")
-                        else:
-                            print(f"⚠️ [{i}] Тираж {draw_num}: некорректные числа")
-                
-                print(f"\n🎯 Обработано {len(processed)} корректных записей")
-                return processed
-            
-            return None
-            
-        except Exception as e:
-            print(f"⚠️ Ошибка в _extract_correct_data: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
-    def _save_to_db(self, data):
-        """Сохраняет в БД"""
-        if not data:
-            print("⚠️ Нет данных для сохранения")
-            return 0
-        
-        saved_count = 0
-        
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Создаем таблицу если её нет
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS lottery_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                draw_number TEXT UNIQUE NOT NULL,
-                date TEXT NOT NULL,
-                time TEXT NOT NULL,
-                field_1 TEXT NOT NULL,
-                field_2 TEXT NOT NULL,
-                temperature REAL,
-                weather TEXT,
-                pressure REAL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            print(f"💾 Сохраняем {len(data)} записей в БД...")
-            
-            # Вставляем данные
-            for i, item in enumerate(data, 1):
-                try:
-                    # ПРОВЕРЯЕМ что сохраняем правильные числа
-                    field_1 = json.loads(item['field_1'])
-                    field_2 = json.loads(item['field_2'])
-                    
-                    if len(field_1) != 4 or len(field_2) != 4:
-                        print(f"⚠️ [{i}] Тираж {item['draw_number']}: пропускаем - некорректные данные")
-                        continue
-                    
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO lottery_results 
-                    (draw_number, date, time, field_1, field_2, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        item['draw_number'],
-                        item['date'],
-                        item['time'],
-                        item['field_1'],
-                        item['field_2'],
-                        item['created_at']
-                    ))
-                    
-                    saved_count += 1
-                    if i <= 10:  # Показываем только первые 10
-                        print(f"   [{i}] Сохранен тираж {item['draw_number']}")
-                    
-                except Exception as e:
-                    print(f"⚠️ Ошибка сохранения тиража {item['draw_number']}: {e}")
-            
-            conn.commit()
-            
-            # Статистика
-            cursor.execute("SELECT COUNT(*) FROM lottery_results")
-            total_count = cursor.fetchone()[0]
-            
-            print(f"\n📊 СТАТИСТИКА БАЗЫ:")
-            print(f"   • Добавлено/обновлено: {saved_count}")
-            print(f"   • Всего записей: {total_count}")
-            
-            # Проверяем последние 3 записи
-            cursor.execute("""
-                SELECT draw_number, date, time, field_1, field_2 
-                FROM lottery_results 
-                ORDER BY draw_number DESC 
-                LIMIT 3
-            """)
-            
-            print(f"\n🔍 ПОСЛЕДНИЕ 3 ЗАПИСИ В БД:")
-            for row in cursor.fetchall():
-                draw_num, date, time, f1, f2 = row
-                print(f"Тираж {draw_num} от {date} {time}:")
-                print(f"   Поле 1: {json.loads(f1)}")
-                print(f"   Поле 2: {json.loads(f2)}")
-            
-            cursor.close()
-            conn.close()
-            
-            return saved_count
-            
-        except Exception as e:
-            print(f"❌ Ошибка БД: {e}")
-            import traceback
-            traceback.print_exc()
-            return 0
-
-def run_parser_sync():
-    """Синхронный запуск для Flask"""
-    parser = CorrectLotteryParser()
-    return asyncio.run(parser.parse_and_save())
-
-if __name__ == "__main__":
-    print("=" * 60)
-    print("🎰 КОРРЕКТНЫЙ ПАРСЕР ЛОТЕРЕИ 4x20")
-    print("=" * 60)
-    result = asyncio.run(CorrectLotteryParser().parse_and_save())
+import asyncio
+import json
+import time
+from datetime import datetime
+from playwright.async_api import async_playwright
+
+from config import Config
+from src.database.attribution import attribute_weather
+from src.database.db import get_db_path, savepoint, transaction
+from src.database.draw_weather import refresh_draw_weather
+from src.database.draws import save_draw
+from src.database.meta import DRAW_COUNT, bump_data_version, get_counter
+from src.database.migrations import ensure_schema
+from src.parsers.browser_manager import StageTimer, get_browser_manager
+from src.utils.metrics import get_metrics
+
+# Строка тиража в архиве lotonews.ru и ее ячейки
+ROW_SELECTOR = '.content-main__circ-render-table-row'
+LINK_SELECTOR = 'a[href*="/draws/archive/4x20/"]'
+TITLE_SELECTOR = '.content-main__circ-render-table-row-cell-title'
+COMB_SELECTOR = '.content-main__circ-render-table-row-cell-comb-container'
+
+# Один проход только по строкам архива: номер из ссылки, дата из заголовка,
+# числа из текстовых узлов комбинации. Результат - плоские массивы
+ROWS_EXTRACT_SCRIPT = '''([rowSelector, linkSelector, titleSelector, combSelector]) => {
+    const drawNumbers = [];
+    const dateTimes = [];
+    const numbers = [];
+    const rows = document.querySelectorAll(rowSelector);
+    let elements = rows.length;
+
+    // Числа по текстовым узлам: "|" отделяет поле 2
+    const readNumbers = (node, found) => {
+        for (const child of node.childNodes) {
+            if (child.nodeType === 3) {
+                for (const token of child.textContent.split(/(\\|)|\\s+/)) {
+                    if (!token) continue;
+                    if (token === '|') {
+                        found.separator = found.values.length;
+                    } else if (/^\\d{1,2}$/.test(token)) {
+                        found.values.push(parseInt(token, 10));
+                    }
+                }
+            } else if (child.nodeType === 1) {
+                elements++;
+                readNumbers(child, found);
+            }
+        }
+        return found;
+    };
+
+    for (const row of rows) {
+        const link = row.querySelector(linkSelector);
+        const title = row.querySelector(titleSelector);
+        const comb = row.querySelector(combSelector);
+        elements += (link ? 1 : 0) + (title ? 1 : 0) + (comb ? 1 : 0);
+        if (!title || !comb) continue;
+
+        const titleText = title.textContent;
+        const dateTime = titleText.match(/(\\d{1,2}\\.\\d{1,2}\\.\\d{4})\\s+(\\d{1,2}:\\d{2})/);
+        const number = (link && (link.getAttribute('href') || '').match(/\\/4x20\\/(\\d+)/))
+            || titleText.match(/\\b(\\d{5})\\b/);
+        if (!dateTime || !number) continue;
+
+        const found = readNumbers(comb, {values: [], separator: -1});
+        let values = found.values;
+        if (found.separator >= 0) {
+            // До черты поле 1, после - поле 2, по 4 числа
+            if (found.separator < 4) continue;
+            values = values.slice(0, 4).concat(values.slice(found.separator, found.separator + 4));
+        }
+        if (values.length < 8) continue;
+
+        drawNumbers.push(number[1]);
+        dateTimes.push(dateTime[1] + ' ' + dateTime[2]);
+        for (let i = 0; i < 8; i++) numbers.push(values[i]);
+    }
+
+    return {
+        draw_numbers: drawNumbers,
+        date_times: dateTimes,
+        numbers: numbers,
+        rows: rows.length,
+        elements: elements
+    };
+}'''
+
+# Прежний разбор: все элементы с draw/tirazh, tr и div.row. Вложенные совпадения
+# дают один тираж много раз, дубликаты отбрасываются уже в Python
+LEGACY_EXTRACT_SCRIPT = '''() => {
+    const results = [];
+    
+    // Ищем ВСЮ таблицу результатов
+    const table = document.querySelector('table');
+    if (!table) {
+        console.log('Таблица не найдена, ищем div-таблицу');
+        // Ищем div-таблицу
+        const divTables = document.querySelectorAll('div[class*="table"], div[class*="archive"]');
+        if (divTables.length > 0) {
+            console.log('Найдена div-таблица');
+        }
+    } else {
+        console.log('Найдена HTML таблица');
+    }
+    
+    // ЛУЧШИЙ СПОСОБ: парсим по блокам тиражей
+    // Ищем все элементы, содержащие тиражи
+    const drawElements = document.querySelectorAll('[class*="draw"], [class*="tirazh"], tr, div[class*="row"]');
+    console.log('Найдено элементов тиражей:', drawElements.length);
+    
+    for (let i = 0; i < drawElements.length; i++) {
+        const element = drawElements[i];
+        const elementText = element.textContent.trim();
+        
+        // Проверяем что это тираж (есть номер тиража 5 цифр)
+        const drawMatch = elementText.match(/\\b(\\d{5})\\b/);
+        if (!drawMatch) continue;
+        
+        const drawNumber = drawMatch[1];
+        
+        // Ищем дату и время (формат: "2.1.2026 22:00")
+        const dateTimeMatch = elementText.match(/(\\d{1,2}\\.\\d{1,2}\\.\\d{4})\\s+(\\d{1,2}:\\d{2})/);
+        if (!dateTimeMatch) continue;
+        
+        const drawDate = dateTimeMatch[1];
+        const drawTime = dateTimeMatch[2];
+        
+        console.log(`\\n🎰 Тираж ${drawNumber} от ${drawDate} ${drawTime}`);
+        
+        // ИЩЕМ ЧИСЛА ПРАВИЛЬНО - по структуре
+        // Способ 1: Ищем блоки с числами в текущем элементе
+        const numberBlocks = element.querySelectorAll('[class*="number"], [class*="ball"], [class*="comb"]');
+        let numbers = [];
+        
+        if (numberBlocks.length > 0) {
+            // Берем числа из специальных блоков
+            numberBlocks.forEach(block => {
+                const blockText = block.textContent.trim();
+                const blockNumbers = blockText.match(/\\b\\d{1,2}\\b/g);
+                if (blockNumbers) {
+                    blockNumbers.forEach(num => {
+                        const n = parseInt(num, 10);
+                        if (n >= 1 && n <= 20 && !numbers.includes(n)) {
+                            numbers.push(n);
+                        }
+                    });
+                }
+            });
+        }
+        
+        // Способ 2: Если не нашли, парсим структурированно
+        if (numbers.length < 8) {
+            // Ищем вертикальные списки чисел (как на сайте)
+            const allText = elementText;
+            
+            // Паттерн: 4 числа, потом |, потом 4 числа
+            const pattern1 = /(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s*\\|\\s*(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})\\s+(\\d{1,2})/;
+            const match1 = pattern1.exec(allText);
+            
+            if (match1) {
+                numbers = [];
+                for (let j = 1; j <= 8; j++) {
+                    numbers.push(parseInt(match1[j], 10));
+                }
+            } else {
+                // Паттерн для чисел в столбик
+                const lines = allText.split(/\\n|\\r/);
+                const potentialNumbers = [];
+                
+                for (const line of lines) {
+                    const trimmed = line.trim();
+                    const num = parseInt(trimmed, 10);
+                    if (!isNaN(num) && num >= 1 && num <= 20) {
+                        potentialNumbers.push(num);
+                    }
+                }
+                
+                // Ищем последовательность из 8 чисел
+                for (let j = 0; j <= potentialNumbers.length - 8; j++) {
+                    const slice = potentialNumbers.slice(j, j + 8);
+                    // Проверяем что это действительно выигрышные числа (могут быть повторы в 4x20)
+                    if (slice.every(n => n >= 1 && n <= 20)) {
+                        numbers = slice;
+                        break;
+                    }
+                }
+            }
+        }
+        
+        // Разделяем на 2 поля по 4 числа
+        if (numbers.length >= 8) {
+            const field_1 = numbers.slice(0, 4);
+            const field_2 = numbers.slice(4, 8);
+            
+            console.log('Поле 1:', field_1);
+            console.log('Поле 2:', field_2);
+            
+            results.push({
+                draw_number: drawNumber,
+                draw_date: drawDate,
+                draw_time: drawTime,
+                numbers: numbers,
+                field_1: field_1,
+                field_2: field_2
+            });
+        } else {
+            console.log('Недостаточно чисел:', numbers);
+        }
+    }
+    
+    console.log('Всего найдено тиражей:', results.length);
+    return results;
+}'''
+
+
+def rows_to_draws(result):
+    """Тиражи в формате _save_to_db из плоских массивов ROWS_EXTRACT_SCRIPT"""
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    numbers = result['numbers']
+    draws = []
+    seen = set()
+    for i, (draw_number, date_time) in enumerate(zip(result['draw_numbers'], result['date_times'])):
+        combination = numbers[i * 8:(i + 1) * 8]
+        if draw_number in seen or not all(1 <= n <= 20 for n in combination):
+            continue
+        seen.add(draw_number)
+        draw_date, draw_time = date_time.split(' ', 1)
+        draws.append({
+            'draw_number': draw_number,
+            'date': draw_date,
+            'time': draw_time,
+            'field_1': json.dumps(combination[:4]),
+            'field_2': json.dumps(combination[4:]),
+            'created_at': created_at
+        })
+    return draws
+
+
+class CorrectLotteryParser:
+    def __init__(self):
+        self.lottery_url = "https://www.lotonews.ru/draws/archive/4x20"
+        self.db_path = get_db_path()
+        self.blocked_requests = 0
+        self.extract_stats = None
+        print(f"🎯 БД парсера: {self.db_path}")
+    
+    async def _route(self, route):
+        """Пропускает только документ и скрипты сайта: картинки, шрифты, стили,
+        реклама и аналитика для разбора таблицы не нужны"""
+        request = route.request
+        if (request.resource_type in Config.SCRAPER_BLOCKED_RESOURCES
+                or any(part and part in request.url for part in Config.SCRAPER_BLOCKED_URLS)):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def scrape(self, page, report=None, timer=None):
+        """Загружает архив на готовой странице и извлекает тиражи.
+
+        timer - StageTimer менеджера браузера для времени этапов
+        """
+        report = report or (lambda stage, value=None: None)
+        timer = timer or StageTimer()
+        self.blocked_requests = 0
+        await page.route('**/*', self._route)
+        
+        report('loading', 0.2)
+        async with timer.measure('goto'):
+            await page.goto(self.lottery_url, wait_until="domcontentloaded",
+                            timeout=Config.SCRAPER_GOTO_TIMEOUT_MS)
+        
+        # Вместо networkidle и пауз - ждем появления строк тиражей
+        async with timer.measure('rows'):
+            await page.wait_for_selector(ROW_SELECTOR, timeout=Config.SCRAPER_ROWS_TIMEOUT_MS)
+        print(f"🚫 Заблокировано запросов: {self.blocked_requests}")
+        
+        # ПАРСИМ ПРАВИЛЬНО - используем структуру таблицы
+        report('extracting', 0.6)
+        async with timer.measure('extract'):
+            return await self._extract_correct_data(page)
+    
+    def save(self, data, report=None, timer=None):
+        """Сохраняет извлеченные тиражи, возвращает число записей"""
+        if not data:
+            return 0
+        print(f"✅ Найдено тиражей: {len(data)}")
+        if report:
+            report('saving', 0.75)
+        started = time.perf_counter()
+        saved_count = self._save_to_db(data)
+        if timer:
+            timer.record('save', time.perf_counter() - started)
+        print(f"💾 Сохранено: {saved_count} записей")
+        return saved_count
+    
+    async def parse_and_save(self, progress=None):
+        """Правильный парсинг структурированной таблицы (отдельный браузер на запуск).
+
+        progress(stage, доля) - необязательный колбэк хода сбора (очередь задач)
+        """
+        print("🔄 Запуск КОРРЕКТНОГО парсера...")
+        
+        async with async_playwright() as p:
+            if progress:
+                progress('browser', 0.1)
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            
+            try:
+                data = await self.scrape(page, progress)
+                return self.save(data, progress)
+                    
+            except Exception as e:
+                print(f"💥 Ошибка: {e}")
+                import traceback
+                traceback.print_exc()
+                return 0
+            finally:
+                await browser.close()
+    
+    async def _extract_correct_data(self, page):
+        """Исправленный метод - парсим таблицу правильно.
+
+        По умолчанию (SCRAPER_EXTRACT_MODE=rows) один проход по строкам
+        архива; прежний разбор - если строк нет или выбран режим legacy
+        """
+        if Config.SCRAPER_EXTRACT_MODE == 'rows':
+            data = await self._extract_rows(page)
+            if data:
+                return data
+            print("↩️ Строки архива не разобраны, прежний разбор страницы")
+        return await self._extract_legacy(page)
+    
+    def _note_extract(self, mode, elements, rows, draws):
+        self.extract_stats = {'mode': mode, 'elements': elements, 'rows': rows, 'draws': draws}
+        print(f"🔎 Разбор ({mode}): элементов {elements}, строк {rows}, тиражей {draws}")
+        get_metrics().note_extract(self.extract_stats)
+    
+    async def _extract_rows(self, page):
+        """Один проход по строкам архива, числа приходят плоскими массивами"""
+        try:
+            result = await page.evaluate(ROWS_EXTRACT_SCRIPT,
+                                         [ROW_SELECTOR, LINK_SELECTOR, TITLE_SELECTOR, COMB_SELECTOR])
+        except Exception as e:
+            print(f"⚠️ Ошибка в _extract_rows: {e}")
+            return None
+        
+        draws = rows_to_draws(result)
+        self._note_extract('rows', result['elements'], result['rows'], len(draws))
+        return draws
+    
+    async def _extract_legacy(self, page):
+        """Прежний разбор по всем похожим на тираж элементам"""
+        try:
+            data = await page.evaluate(LEGACY_EXTRACT_SCRIPT)
+            
+            # Обрабатываем полученные данные
+            if data:
+                print(f"\n📊 Получено {len(data)} записей")
+                processed = []
+                seen = set()
+                
+                for i, item in enumerate(data, 1):
+                    draw_num = str(item['draw_number']).strip()
+                    
+                    if draw_num and draw_num not in seen:
+                        seen.add(draw_num)
+                        
+                        # Проверяем что числа корректные
+                        field_1 = item.get('field_1', [])
+                        field_2 = item.get('field_2', [])
+                        
+                        if len(field_1) == 4 and len(field_2) == 4:
+                            processed.append({
+                                'draw_number': draw_num,
+                                'date': item['draw_date'],
+                                'time': item['draw_time'],
+                                'field_1': json.dumps(field_1),
+                                'field_2': json.dumps(field_2),
+                                'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
+                            
+                            print(f"✅ [{i}] Тираж {draw_num}: {item['draw_date']} {item['draw_time']}")
+                            print(f"   Поле 1: {field_1}")
+                            print(f"   Поле 2: {field_2}")
+                        else:
+                            print(f"⚠️ [{i}] Тираж {draw_num}: некорректные числа")
+                
+                print(f"\n🎯 Обработано {len(processed)} корректных записей")
+                self._note_extract('legacy', None, len(data), len(processed))
+                return processed
+            
+            return None
+            
+        except Exception as e:
+            print(f"⚠️ Ошибка в _extract_legacy: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+    
+    def _save_to_db(self, data):
+        """Сохраняет в БД"""
+        if not data:
+            print("⚠️ Нет данных для сохранения")
+            return 0
+        
+        saved_count = 0
+        
+        try:
+            # Создаем таблицы и применяем миграции если нужно
+            ensure_schema()
+            
+            saved_ids = []
+            
+            with transaction() as conn:
+                print(f"💾 Сохраняем {len(data)} записей в БД...")
+                
+                # Вставляем данные
+                for i, item in enumerate(data, 1):
+                    try:
+                        # ПРОВЕРЯЕМ что сохраняем правильные числа
+                        field_1 = json.loads(item['field_1'])
+                        field_2 = json.loads(item['field_2'])
+                        
+                        if len(field_1) != 4 or len(field_2) != 4:
+                            print(f"⚠️ [{i}] Тираж {item['draw_number']}: пропускаем - некорректные данные")
+                            continue
+                        
+                        # Строка тиража + нормализованные номера в draw_numbers.
+                        # Ошибка посреди записи откатывает только этот тираж
+                        with savepoint(conn, 'draw'):
+                            draw_id, changed = save_draw(conn, item)
+                        if not changed:
+                            continue
+                        
+                        saved_ids.append(draw_id)
+                        saved_count += 1
+                        if saved_count <= 10:  # Показываем только первые 10
+                            print(f"   [{i}] Сохранен тираж {item['draw_number']}")
+                        
+                    except Exception as e:
+                        print(f"⚠️ Ошибка сохранения тиража {item['draw_number']}: {e}")
+                
+                if saved_ids:
+                    # Новая версия данных: кэши в памяти догрузят изменения.
+                    # Повторный сбор без новых тиражей версию не меняет
+                    bump_data_version(conn)
+                    # Погода за сутки новых тиражей в draw_weather
+                    refresh_draw_weather(conn, saved_ids)
+                
+                # Статистика
+                total_count = get_counter(conn, DRAW_COUNT)
+                
+                print(f"\n📊 СТАТИСТИКА БАЗЫ:")
+                print(f"   • Добавлено/обновлено: {saved_count}")
+                print(f"   • Всего записей: {total_count}")
+                
+                # Проверяем последние 3 записи
+                rows = conn.execute("""
+                    SELECT draw_number, date, time, field_1, field_2 
+                    FROM lottery_results 
+                    ORDER BY draw_ts DESC, CAST(draw_number AS INTEGER) DESC 
+                    LIMIT 3
+                """).fetchall()
+                
+                print(f"\n🔍 ПОСЛЕДНИЕ 3 ЗАПИСИ В БД:")
+                for row in rows:
+                    draw_num, date, time, f1, f2 = row
+                    print(f"Тираж {draw_num} от {date} {time}:")
+                    print(f"   Поле 1: {json.loads(f1)}")
+                    print(f"   Поле 2: {json.loads(f2)}")
+            
+            # Новым тиражам - ближайший уже известный замер погоды
+            attribute_weather(only_missing=True)
+            
+            get_metrics().note_scrape(saved_count)
+            return saved_count
+            
+        except Exception as e:
+            print(f"❌ Ошибка БД: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+
+def run_parser_sync(progress=None):
+    """Синхронный запуск для Flask: HTML по HTTP или общий браузер процесса"""
+    if Config.LOTTERY_PARSER_BACKEND == 'http':
+        from src.parsers.html_parser import run_http_parser
+        saved_count = run_http_parser(progress)
+        if saved_count is not None:
+            return saved_count
+        print("↩️ Переход на сбор через браузер")
+    return run_browser_parser(progress)
+
+def run_browser_parser(progress=None):
+    """Сбор в общем браузере процесса"""
+    parser = CorrectLotteryParser()
+    manager = get_browser_manager()
+    print("🔄 Запуск КОРРЕКТНОГО парсера...")
+    
+    try:
+        if progress:
+            progress('browser', 0.1)
+        started = time.perf_counter()
+        data = manager.run(lambda page: parser.scrape(page, progress, manager.timer))
+        manager.timer.record('scrape', time.perf_counter() - started)
+        saved_count = parser.save(data, progress, manager.timer)
+    except Exception as e:
+        print(f"💥 Ошибка: {e}")
+        import traceback
+        traceback.print_exc()
+        return 0
+    
+    timings = manager.timer.stats()
+    print("⏱️ Этапы: " + ", ".join(f"{stage} {entry['last']}с" for stage, entry in timings.items()))
+    return saved_count
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🎰 КОРРЕКТНЫЙ ПАРСЕР ЛОТЕРЕИ 4x20")
+    print("=" * 60)
+    result = asyncio.run(CorrectLotteryParser().parse_and_save())
     print(f"\n✨ Парсинг завершен. Сохранено записей: {result}")
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Дисковый кэш аналитики в Config.CACHE_DIR
+
+Артефакты - словари NumPy-массивов (.npz) и JSON (.json). Имя файла -
+пространство имен и хэш ключа; в ключ вызывающий код включает версию
+данных, поэтому устаревшая запись просто не находится и со временем
+вытесняется. Запись атомарная (временный файл + os.replace), чтение
+обновляет mtime, а при превышении CACHE_MAX_MB удаляются файлы с самым
+старым mtime (LRU по файлам всего каталога). Число файлов и байт ведется
+счетчиками: каталог сканируется один раз при первом обращении и при
+вытеснении, а не на каждую запись и не в /api/health.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from config import Config
+
+CACHE_SUFFIXES = ('.npz', '.json')
+
+
+class DiskCache:
+    """Ограниченный по размеру LRU-кэш файлов"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or Config.CACHE_DIR
+        self.max_bytes = max_bytes or Config.CACHE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evicted': 0, 'errors': 0}
+        # Файлы и байты каталога; None - еще не сканировался
+        self._entries = None
+        self._bytes = None
+
+    def _path(self, namespace, key, suffix):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:24]
+        return os.path.join(self.directory, f"{namespace}-{digest}{suffix}")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    def _ensure_totals(self):
+        """Счетчики файлов и байт (первый вызов сканирует каталог)"""
+        with self._lock:
+            if self._bytes is not None:
+                return
+        files = self._files()
+        with self._lock:
+            if self._bytes is None:
+                self._entries = len(files)
+                self._bytes = sum(size for _, size, _ in files)
+
+    def _account(self, old_size, new_size):
+        """Учитывает замену файла размера old_size файлом new_size (None - нет файла)"""
+        with self._lock:
+            if self._bytes is None:
+                return
+            self._entries += (new_size is not None) - (old_size is not None)
+            self._bytes += (new_size or 0) - (old_size or 0)
+
+    def _read(self, path, reader):
+        if not os.path.exists(path):
+            self._count('misses')
+            return None
+        try:
+            value = reader(path)
+            os.utime(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Дисковый кэш: {os.path.basename(path)} не прочитан: {e}")
+            self._count('errors')
+            return None
+        self._count('hits')
+        return value
+
+    def _write(self, path, writer):
+        """Атомарная запись: временный файл в том же каталоге + os.replace.
+
+        Имя временного файла уникально и между процессами (mkstemp): воркеры
+        gunicorn с общим CACHE_DIR не пишут в один и тот же файл.
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            root, suffix = os.path.splitext(os.path.basename(path))
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{root}.tmp", suffix=suffix, dir=self.directory)
+            os.close(fd)
+            writer(tmp_path)
+            self._ensure_totals()
+            old_size = self._size(path)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Дисковый кэш: {os.path.basename(path)} не записан: {e}")
+            self._count('errors')
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+        self._account(old_size, self._size(path))
+        self._count('writes')
+        with self._lock:
+            over_limit = self._bytes > self.max_bytes
+        if over_limit:
+            self.evict(keep=path)
+        return True
+
+    def get_json(self, namespace, key):
+        def reader(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return self._read(self._path(namespace, key, '.json'), reader)
+
+    def put_json(self, namespace, key, value):
+        def writer(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+        return self._write(self._path(namespace, key, '.json'), writer)
+
+    def get_arrays(self, namespace, key):
+        """{имя: массив} или None"""
+        def reader(path):
+            with np.load(path, allow_pickle=False) as data:
+                return {name: data[name] for name in data.files}
+        return self._read(self._path(namespace, key, '.npz'), reader)
+
+    def put_arrays(self, namespace, key, arrays):
+        return self._write(self._path(namespace, key, '.npz'), lambda path: np.savez(path, **arrays))
+
+    def delete(self, namespace, key):
+        """Удаляет запись (оба формата) - например, артефакт прежней версии данных"""
+        for suffix in CACHE_SUFFIXES:
+            path = self._path(namespace, key, suffix)
+            size = self._size(path)
+            if size is None:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._account(size, None)
+
+    def _files(self):
+        files = []
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return files
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(CACHE_SUFFIXES) and '.tmp' not in entry.name:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, keep=None):
+        """Удаляет самые давно использованные файлы, пока каталог больше лимита"""
+        files = sorted(self._files())
+        entries = len(files)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            entries -= 1
+            total -= size
+            self._count('evicted')
+        # Скан заодно сверяет счетчики с каталогом
+        with self._lock:
+            self._entries = entries
+            self._bytes = total
+
+    def stats(self):
+        """Счетчики без обхода каталога (кроме самого первого вызова)"""
+        self._ensure_totals()
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'entries': self._entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                **self._stats
+            }
+
+
+_disk_cache = DiskCache()
+
+
+def get_disk_cache():
+    """Общий на процесс дисковый кэш"""
+    return _disk_cache
@@ -0,0 +1,90 @@
+"""
+Снимок метрик для /api/health и главной страницы
+
+Число тиражей и замеров погоды берется из счетчиков app_meta (их ведут
+триггеры), время последнего тиража и замера - MAX по индексам. Снимок
+перечитывается только при смене data_version, поэтому проверка здоровья -
+один запрос по первичному ключу независимо от размера таблиц. Парсеры
+отмечают здесь время последнего сбора.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+from src.database.db import db_exists, get_connection, get_db_path
+from src.database.meta import DRAW_COUNT, WEATHER_COUNT, get_counter, get_data_version
+
+
+class Metrics:
+    """Счетчики данных текущей версии + события записи в этом процессе"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._data = {}
+        self._events = {
+            'last_scrape': None,
+            'last_scrape_saved': None,
+            'last_weather_saved': None,
+            'last_extract': None
+        }
+        self.refreshes = 0
+
+    def _read(self, conn, version):
+        data = {
+            'schema_ready': True,
+            'data_version': version,
+            'records': get_counter(conn, DRAW_COUNT),
+            'weather_records': get_counter(conn, WEATHER_COUNT),
+            'last_draw_ts': None,
+            'last_weather_ts': None
+        }
+        try:
+            data['last_draw_ts'] = conn.execute("SELECT MAX(draw_ts) FROM lottery_results").fetchone()[0]
+            data['last_weather_ts'] = conn.execute("SELECT MAX(ts_epoch) FROM weather_history").fetchone()[0]
+        except sqlite3.OperationalError:
+            data['schema_ready'] = False
+        return data
+
+    def snapshot(self):
+        """Метрики для текущей версии данных (без COUNT(*))"""
+        if not db_exists():
+            return {'database': False, 'records': 0, **self._events}
+
+        db_path = get_db_path()
+        with get_connection() as conn:
+            version = get_data_version(conn)
+            if self._key != (db_path, version):
+                data = self._read(conn, version)
+                with self._lock:
+                    self._data = data
+                    self._key = (db_path, version)
+                    self.refreshes += 1
+
+        with self._lock:
+            return {'database': True, **self._data, **self._events}
+
+    def note_scrape(self, saved_count):
+        """Сбор лотереи завершен и записан"""
+        with self._lock:
+            self._events['last_scrape'] = datetime.now().isoformat()
+            self._events['last_scrape_saved'] = saved_count
+
+    def note_extract(self, stats):
+        """Разбор страницы архива: режим, число элементов, строк и тиражей"""
+        with self._lock:
+            self._events['last_extract'] = dict(stats)
+
+    def note_weather(self):
+        """Замер погоды сохранен"""
+        with self._lock:
+            self._events['last_weather_saved'] = datetime.now().isoformat()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Общий на процесс снимок метрик"""
+    return _metrics
@@ -0,0 +1,159 @@
+"""
+LRU-кэш JSON-ответов аналитических маршрутов
+
+Ключ - маршрут, отсортированные параметры запроса, файл БД и data_version
+из app_meta. Парсеры увеличивают версию при каждой записи, поэтому ответы
+живут до следующего сбора данных. У ответа есть ETag: браузер присылает
+If-None-Match и при неизменных данных получает 304 без тела.
+
+Вторым уровнем ответы лежат в дисковом кэше, поэтому после перезапуска
+первые запросы не пересчитываются. Кэш помнит самые частые запросы -
+по ним прогрев после сбора данных заранее считает ответы новой версии.
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, request
+
+from config import Config
+from src.database.db import db_exists, get_connection, get_db_path
+from src.database.meta import get_data_version
+from src.utils.disk_cache import get_disk_cache
+
+
+# Запросы прогрева (заголовок) в статистику популярных не попадают
+WARM_UP_HEADER = 'X-Warm-Up'
+
+# Сколько разных запросов помнить для выбора популярных
+POPULAR_MAX = 1000
+
+
+class ResponseCache:
+    """Ограниченный LRU: ключ -> (тело, ETag)"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'evicted': 0}
+        self._popular = Counter()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key, version, body):
+        entry = (body, hashlib.sha1(body).hexdigest()[:20])
+        with self._lock:
+            # Ответ, посчитанный до свежей записи, уже устарел
+            if self._version is not None and version < self._version:
+                return entry
+            # Новая версия данных - старые ответы больше не понадобятся
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evicted'] += 1
+        return entry
+
+    def record(self, path, query):
+        """Учитывает запрос пользователя (путь и нормализованные параметры)"""
+        with self._lock:
+            self._popular[(path, query)] += 1
+            if len(self._popular) > POPULAR_MAX:
+                self._popular = Counter(dict(self._popular.most_common(POPULAR_MAX // 2)))
+
+    def popular(self, limit):
+        """Самые частые запросы: ['/путь?параметры', ...]"""
+        with self._lock:
+            items = self._popular.most_common(limit)
+        return [f"{path}?{query}" if query else path for (path, query), _ in items]
+
+    def count_not_modified(self):
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'data_version': self._version,
+                **self._stats
+            }
+
+
+_cache = ResponseCache()
+
+
+def get_response_cache():
+    return _cache
+
+
+def _json_response(body, etag):
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Браузер хранит ответ, но каждый раз сверяет ETag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+def cached_response(view):
+    """Декоратор маршрута: ответ из кэша по (маршрут, параметры, версия данных).
+
+    Кэшируются только успешные JSON-ответы (200 и success != false),
+    ошибки и демо-ответы без БД всегда считаются заново.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not db_exists():
+            return view(*args, **kwargs)
+
+        with get_connection() as conn:
+            version = get_data_version(conn)
+        params = tuple(sorted(request.args.items(multi=True)))
+        key = (request.endpoint, params, get_db_path(), version)
+        if WARM_UP_HEADER not in request.headers:
+            _cache.record(request.path, urlencode(params))
+
+        entry = _cache.get(key)
+        if entry is None:
+            stored = get_disk_cache().get_json('response', key)
+            if stored is not None:
+                entry = _cache.put(key, version, stored['body'].encode('utf-8'))
+
+        if entry is None:
+            response = view(*args, **kwargs)
+            if isinstance(response, tuple) or response.status_code != 200 or not response.is_json:
+                return response
+            payload = response.get_json(silent=True)
+            if not isinstance(payload, dict) or payload.get('success') is False:
+                return response
+            entry = _cache.put(key, version, response.get_data())
+            get_disk_cache().put_json('response', key, {'body': entry[0].decode('utf-8')})
+
+        response = _json_response(*entry)
+        if response.status_code == 304:
+            _cache.count_not_modified()
+        return response
+
+    return wrapper
@@ -0,0 +1,99 @@
+# bench_db_pool.py - сравниваем открытие соединения на каждый запрос и пул соединений
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))  # tests
+project_root = os.path.dirname(script_dir)  # lotto-meteo-stats
+sys.path.insert(0, project_root)
+
+from src.database import db
+
+ITERATIONS = 300
+
+QUERIES = {
+    'COUNT(*)': "SELECT COUNT(*) FROM lottery_results",
+    'field_1, field_2': "SELECT field_1, field_2 FROM lottery_results",
+    'последние тиражи': "SELECT draw_number, date, time FROM lottery_results ORDER BY draw_number DESC LIMIT 10",
+}
+
+ENDPOINTS = ['/api/health', '/api/lottery/statistics', '/api/weather/history?limit=7', '/api/felix-pila/predict']
+
+
+def bench(func, iterations=ITERATIONS):
+    """Среднее время вызова в миллисекундах"""
+    func()  # прогрев
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    source_db = os.path.join(project_root, 'data', 'lottery.db')
+    if not os.path.exists(source_db):
+        print(f"❌ Файл БД не найден: {source_db}")
+        return
+
+    # Работаем с копией, чтобы не переводить рабочую БД в WAL
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, 'lottery.db')
+    shutil.copy(source_db, db_path)
+    pool = db.configure(db_path)
+
+    print("📊 БЕНЧМАРК СОЕДИНЕНИЙ SQLite")
+    print("=" * 60)
+    print(f"{'Запрос':25} {'connect/close':>15} {'пул':>10} {'ускорение':>10}")
+
+    for name, sql in QUERIES.items():
+        def fresh_connection():
+            conn = sqlite3.connect(db_path)
+            conn.execute(sql).fetchall()
+            conn.close()
+
+        def pooled_connection():
+            with db.get_connection() as conn:
+                conn.execute(sql).fetchall()
+
+        fresh_ms = bench(fresh_connection)
+        pooled_ms = bench(pooled_connection)
+        print(f"{name:25} {fresh_ms:12.3f} мс {pooled_ms:7.3f} мс {fresh_ms / pooled_ms:9.1f}x")
+
+    # Полный цикл запроса Flask: без пула каждый запрос получает новое соединение
+    os.environ['DATABASE_PATH'] = db_path
+    import app as app_module
+    client = app_module.app.test_client()
+
+    print("\n🌐 Время ответа API (мс на запрос)")
+    print(f"{'Маршрут':35} {'без пула':>10} {'пул':>10}")
+
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    for url in ENDPOINTS:
+        def request_without_pool():
+            db.configure(db_path)
+            client.get(url)
+
+        def request_with_pool():
+            client.get(url)
+
+        sys.stdout = devnull  # маршруты много печатают
+        try:
+            fresh_ms = bench(request_without_pool, 100)
+            db.configure(db_path)
+            pooled_ms = bench(request_with_pool, 100)
+        finally:
+            sys.stdout = stdout
+        print(f"{url:35} {fresh_ms:10.3f} {pooled_ms:10.3f}")
+
+    print(f"\n🔌 Пул: {db.get_pool().stats()}")
+    db.get_pool().close_all()
+    pool.close_all()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
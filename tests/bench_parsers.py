@@ -0,0 +1,103 @@
+# bench_parsers.py - скорость извлечения тиражей из сохраненных страниц архива (офлайн)
+import asyncio
+import os
+import re
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))  # tests
+project_root = os.path.dirname(script_dir)  # lotto-meteo-stats
+sys.path.insert(0, project_root)
+
+from src.parsers.html_parser import extract_draws
+from src.parsers.lottery_parser import (COMB_SELECTOR, LEGACY_EXTRACT_SCRIPT, LINK_SELECTOR, ROW_SELECTOR,
+                                        ROWS_EXTRACT_SCRIPT, TITLE_SELECTOR, rows_to_draws)
+
+ITERATIONS = 20
+
+# Во сколько раз размножить строки фикстуры для "большой" страницы
+SCALE = 20
+
+FIXTURE = os.path.join(script_dir, 'fixtures', 'lotonews_4x20_archive.html')
+
+
+def bench(func, iterations=ITERATIONS):
+    """Среднее время вызова в миллисекундах"""
+    func()  # прогрев
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def scaled_page(html, scale):
+    """Страница с теми же строками, повторенными scale раз под новыми номерами"""
+    rows = re.findall(r'( {12}<div class="content-main__circ-render-table-row">.*?\n {12}</div>)', html, re.S)
+    copies = []
+    for i in range(scale):
+        for row in rows:
+            copies.append(re.sub(r'(\d{5})', lambda m: str(int(m.group(1)) + i * 100000), row))
+    return html.replace('\n'.join(rows), '\n'.join(copies))
+
+
+# Селектор прежнего скрипта - сколько элементов он обходит
+LEGACY_SELECTOR = '[class*="draw"], [class*="tirazh"], tr, div[class*="row"]'
+
+
+async def bench_browser(pages):
+    """Прежний скрипт и проход по строкам в headless Chromium на тех же страницах"""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            print(f"⚠️ Chromium недоступен, сравнение в браузере пропущено: {e}")
+            return
+        page = await browser.new_page()
+        args = [ROW_SELECTOR, LINK_SELECTOR, TITLE_SELECTOR, COMB_SELECTOR]
+
+        print(f"\n{'Страница':25} {'режим':>8} {'элементов':>10} {'строк':>8} {'тиражей':>8} {'мс':>10}")
+        for name, html in pages.items():
+            await page.set_content(html)
+
+            legacy = await page.evaluate(LEGACY_EXTRACT_SCRIPT)
+            elements = await page.evaluate('(selector) => document.querySelectorAll(selector).length', LEGACY_SELECTOR)
+            start = time.perf_counter()
+            for _ in range(ITERATIONS):
+                await page.evaluate(LEGACY_EXTRACT_SCRIPT)
+            ms = (time.perf_counter() - start) * 1000 / ITERATIONS
+            unique = len({item['draw_number'] for item in legacy})
+            print(f"{name:25} {'legacy':>8} {elements:10} {len(legacy):8} {unique:8} {ms:10.2f}")
+
+            result = await page.evaluate(ROWS_EXTRACT_SCRIPT, args)
+            start = time.perf_counter()
+            for _ in range(ITERATIONS):
+                await page.evaluate(ROWS_EXTRACT_SCRIPT, args)
+            ms = (time.perf_counter() - start) * 1000 / ITERATIONS
+            draws = len(rows_to_draws(result))
+            print(f"{name:25} {'rows':>8} {result['elements']:10} {result['rows']:8} {draws:8} {ms:10.2f}")
+
+        await browser.close()
+
+
+def main():
+    with open(FIXTURE, encoding='utf-8') as f:
+        html = f.read()
+    pages = {'архив (фикстура)': html, f'архив x{SCALE}': scaled_page(html, SCALE)}
+
+    print("📊 БЕНЧМАРК ИЗВЛЕЧЕНИЯ ТИРАЖЕЙ (HTML + BeautifulSoup)")
+    print("=" * 60)
+    print(f"{'Страница':25} {'КБ':>8} {'тиражей':>10} {'мс':>10}")
+    for name, page in pages.items():
+        draws = len(extract_draws(page))
+        ms = bench(lambda: extract_draws(page))
+        print(f"{name:25} {len(page.encode('utf-8')) / 1024:8.1f} {draws:10} {ms:10.2f}")
+
+    print("\n📊 РАЗБОР В БРАУЗЕРЕ: прежний скрипт и проход по строкам")
+    print("=" * 60)
+    asyncio.run(bench_browser(pages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# conftest.py - общие фикстуры и помощники тестов
+import pytest
+
+from src.analysis import weather_cube
+from src.analyzers import felix_pila
+from src.database import db
+from src.database.draws import save_draw
+from src.database.migrations import ensure_schema
+from src.database.timestamps import parse_weather_ts
+from src.utils import disk_cache
+from src.utils.disk_cache import DiskCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_cache(tmp_path, monkeypatch):
+    """Дисковый кэш каждого теста - во временном каталоге, а не в data/cache"""
+    cache = DiskCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(disk_cache, '_disk_cache', cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_models(monkeypatch):
+    """Куб погоды и модель Felix Pila не переходят из теста в тест"""
+    monkeypatch.setattr(weather_cube, '_cube', None)
+    monkeypatch.setattr(felix_pila, '_model', None)
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """Пустая БД со схемой во временном каталоге"""
+    pool = db.configure(str(tmp_path / 'lottery.db'))
+    ensure_schema()
+    yield pool
+    db.configure()
+
+
+def add_draw(conn, draw_number, date='2.1.2026', time='10:00', field_1=(1, 2, 3, 4), field_2=(5, 6, 7, 8)):
+    """Тираж в формате парсера; (id, изменена ли запись) как у save_draw"""
+    return save_draw(conn, {
+        'draw_number': draw_number, 'date': date, 'time': time,
+        'field_1': list(field_1), 'field_2': list(field_2), 'created_at': '2026-01-01 00:00:00'
+    })
+
+
+def add_weather(conn, timestamp, temperature, description='ясно', humidity=None):
+    """Замер погоды в weather_history (Москва, 750 мм рт. ст.)"""
+    conn.execute('''
+        INSERT INTO weather_history (timestamp, ts_epoch, temperature, humidity, weather_description, pressure_mmhg, city)
+        VALUES (?, ?, ?, ?, ?, 750, 'Moscow')
+    ''', (timestamp, parse_weather_ts(timestamp), temperature, humidity, description))
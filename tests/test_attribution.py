@@ -0,0 +1,45 @@
+# test_attribution.py - привязка ближайшего замера погоды к тиражам
+from src.database import db
+from src.database.attribution import attribute_weather
+from tests.conftest import add_draw, add_weather
+
+
+def attributed():
+    with db.get_connection() as conn:
+        return {
+            row['draw_number']: row['temperature']
+            for row in conn.execute("SELECT draw_number, temperature FROM lottery_results")
+        }
+
+
+def test_nearest_within_tolerance(temp_db):
+    with db.transaction() as conn:
+        add_draw(conn, '10001', '2.1.2026', '10:00')
+        add_draw(conn, '10002', '2.1.2026', '16:22')
+        add_draw(conn, '10003', '5.1.2026', '12:00')
+        add_weather(conn, '2026-01-02T09:40:00', -5.0)
+        add_weather(conn, '2026-01-02T10:05:00', -4.0)
+        add_weather(conn, '2026-01-02T17:00:00', -2.0)
+
+    assert attribute_weather(tolerance_min=60) == 2
+    assert attributed() == {'10001': -4.0, '10002': -2.0, '10003': None}
+
+
+def test_incremental_only_missing(temp_db):
+    with db.transaction() as conn:
+        add_draw(conn, '10001', '2.1.2026', '10:00')
+        add_weather(conn, '2026-01-02T10:30:00', -4.0)
+    assert attribute_weather(tolerance_min=60) == 1
+
+    with db.transaction() as conn:
+        add_draw(conn, '10002', '2.1.2026', '12:00')
+        add_weather(conn, '2026-01-02T12:01:00', 1.0)
+        add_weather(conn, '2026-01-02T10:00:00', -6.0)
+
+    # Уже привязанный тираж не пересчитывается
+    assert attribute_weather(tolerance_min=60) == 1
+    assert attributed() == {'10001': -4.0, '10002': 1.0}
+
+    # Полный пересчет находит более близкий замер
+    assert attribute_weather(only_missing=False, tolerance_min=60) == 2
+    assert attributed() == {'10001': -6.0, '10002': 1.0}
@@ -0,0 +1,56 @@
+# test_bitmask.py - проверка битовых масок полей 4x20
+import numpy as np
+
+from src.analysis.bitmask import MaskIndex, mask_to_numbers, numbers_to_mask
+
+DRAWS = [
+    ([1, 2, 3, 4], [1, 5, 6, 7]),
+    ([1, 2, 10, 20], [2, 3, 4, 5]),
+    ([10, 11, 12, 20], [17, 18, 19, 20]),
+]
+
+
+def make_index():
+    return MaskIndex(
+        [numbers_to_mask(f1) for f1, _ in DRAWS],
+        [numbers_to_mask(f2) for _, f2 in DRAWS]
+    )
+
+
+def test_mask_roundtrip():
+    assert numbers_to_mask([1]) == 1
+    assert numbers_to_mask([20]) == 1 << 19
+    assert mask_to_numbers(numbers_to_mask([20, 4, 12, 1])) == [1, 4, 12, 20]
+
+
+def test_frequency_matches_plain_count():
+    index = make_index()
+    expected = np.zeros(20, dtype=int)
+    for f1, f2 in DRAWS:
+        for n in f1 + f2:
+            expected[n - 1] += 1
+    assert index.frequency().tolist() == expected.tolist()
+    assert index.frequency(1)[0] == 2  # число 1 в поле 1 двух тиражей
+
+
+def test_contains_and_match_counts():
+    index = make_index()
+    assert index.contains([1, 2], field=1).tolist() == [True, True, False]
+    assert index.count_containing([20]) == 2
+    assert index.match_counts([1, 2, 3, 4], [2, 3, 4, 5]).tolist() == [5, 6, 0]
+
+
+def test_cooccurrence():
+    index = make_index()
+    pairs = index.cooccurrence(1)
+    assert pairs[0, 1] == 2  # 1 и 2 вместе в поле 1 дважды
+    assert pairs[9, 19] == 2  # 10 и 20
+    cross = index.cooccurrence(1, 2)
+    assert cross[19, 19] == 1  # 20 в обоих полях третьего тиража
+
+
+def test_triples():
+    triples = make_index().triples(1)
+    assert triples[0, 1, 2] == 1  # 1, 2, 3 в поле 1 первого тиража
+    assert triples[9, 10, 19] == 1  # 10, 11, 20
+    assert triples[0, 1, 9] == 1  # 1, 2, 10
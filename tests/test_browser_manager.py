@@ -0,0 +1,98 @@
+# test_browser_manager.py - общий браузер: переиспользование и перезапуск
+import pytest
+
+from src.parsers.browser_manager import BrowserManager
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    async def stop(self):
+        pass
+
+
+def test_browser_is_reused_and_restarted_after_crash():
+    browsers = []
+
+    async def launch():
+        browsers.append(FakeBrowser())
+        return FakePlaywright(), browsers[-1]
+
+    async def scrape(page):
+        return 'ok'
+
+    manager = BrowserManager(pool_size=1, context_max_uses=10, launch=launch)
+    try:
+        assert [manager.run(scrape) for _ in range(3)] == ['ok'] * 3
+        stats = manager.stats()
+        assert (stats['launches'], stats['contexts_created'], stats['runs']) == (1, 1, 3)
+        assert stats['timings']['launch']['count'] == 1
+
+        # Браузер упал - следующий сбор запускает новый
+        browsers[0].connected = False
+        assert manager.run(scrape) == 'ok'
+
+        async def crash(page):
+            raise RuntimeError('page crashed')
+        with pytest.raises(RuntimeError):
+            manager.run(crash)
+        stats = manager.stats()
+        assert (stats['launches'], stats['restarts'], stats['errors']) == (2, 1, 1)
+        # Контекст после ошибки закрыт, новый создается заново
+        assert stats['idle_contexts'] == 0
+    finally:
+        manager.shutdown()
+    assert not manager.stats()['running']
+
+
+def test_timed_out_run_is_cancelled_and_frees_the_page():
+    import asyncio
+    import concurrent.futures
+
+    async def launch():
+        return FakePlaywright(), FakeBrowser()
+
+    async def hang(page):
+        await asyncio.sleep(30)
+
+    async def scrape(page):
+        return 'ok'
+
+    manager = BrowserManager(pool_size=1, context_max_uses=10, launch=launch)
+    try:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            manager.run(hang, timeout=0.2)
+        # Зависший сбор отменен: единственный слот пула свободен
+        assert manager.run(scrape, timeout=5) == 'ok'
+        stats = manager.stats()
+        assert (stats['cancelled'], stats['runs'], stats['contexts_created']) == (1, 1, 2)
+    finally:
+        manager.shutdown()
@@ -0,0 +1,44 @@
+# test_disk_cache.py - счетчики и LRU-вытеснение дискового кэша
+import os
+
+import numpy as np
+
+from src.utils.disk_cache import DiskCache
+
+
+def test_counters_follow_put_delete_and_evict(tmp_path):
+    directory = tmp_path / 'cache'
+    directory.mkdir()
+    (directory / 'old-0.json').write_text('{"a": 1}')
+    cache = DiskCache(str(directory), max_bytes=10 ** 6)
+
+    # Уже лежащие файлы учитываются первым сканом
+    assert cache.stats()['entries'] == 1
+    cache.put_json('data', 1, {'value': 1})
+    cache.put_json('data', 1, {'value': 12})
+    cache.put_arrays('arrays', 1, {'x': np.arange(10)})
+    cache.delete('data', 1)
+
+    def on_disk():
+        sizes = [entry.stat().st_size for entry in os.scandir(directory)]
+        return len(sizes), sum(sizes)
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes']) == on_disk() and stats['entries'] == 2
+
+    # Превышение лимита вытесняет старые файлы, счетчики совпадают с каталогом
+    cache.max_bytes = stats['bytes'] + 1000
+    cache.put_arrays('arrays', 2, {'x': np.arange(100)})
+    stats = cache.stats()
+    assert stats['evicted'] >= 1 and stats['bytes'] <= cache.max_bytes
+    assert (stats['entries'], stats['bytes']) == on_disk()
+    assert cache.get_arrays('arrays', 2)['x'].tolist() == list(range(100))
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    assert cache.put_json('data', 1, {'value': 1})
+    # Несериализуемое значение: запись не удалась, временный файл удален
+    assert not cache.put_json('data', 2, {'value': object()})
+    assert os.listdir(tmp_path) == [os.path.basename(cache._path('data', 1, '.json'))]
+    assert cache.stats()['errors'] == 1
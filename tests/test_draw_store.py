@@ -0,0 +1,102 @@
+# test_draw_store.py - догрузка DrawStore по версии данных
+from src.analysis.draw_store import DrawStore
+from src.database import db
+from src.database.meta import bump_data_version
+from tests.conftest import add_draw
+
+
+def publish_draw(draw_number, time, field_1):
+    """Тираж отдельной записью с новой версией данных, как после сбора"""
+    with db.transaction() as conn:
+        bump_data_version(conn)
+        add_draw(conn, draw_number, time=time, field_1=field_1)
+
+
+def test_append_and_reload(temp_db):
+    store = DrawStore()
+    publish_draw('10001', '10:00', [1, 2, 3, 4])
+    assert store.get().frequency(1)[:4].tolist() == [1, 1, 1, 1]
+
+    # Новый тираж позже последнего - только догрузка
+    publish_draw('10002', '12:00', [1, 9, 10, 11])
+    snapshot = store.get()
+    assert (store.full_loads, store.appends) == (1, 1)
+    assert snapshot.draw_numbers.tolist() == ['10001', '10002']
+    assert snapshot.frequency(1)[0] == 2
+
+    # Без записей срез не пересобирается
+    assert store.get() is snapshot
+
+    # Переписанный тираж - полная перезагрузка
+    publish_draw('10001', '10:00', [20, 2, 3, 4])
+    snapshot = store.get()
+    assert store.full_loads == 2
+    assert snapshot.frequency(1)[0] == 1
+    assert snapshot.masks.count_containing([20], field=1) == 1
+
+
+def test_window_prefix_sums(temp_db):
+    store = DrawStore()
+    publish_draw('10001', '08:00', [1, 2, 3, 4])
+    store.get()
+    publish_draw('10002', '12:00', [1, 9, 10, 11])
+    publish_draw('10003', '16:00', [2, 9, 12, 13])
+    snapshot = store.get()
+
+    # Префиксные суммы после догрузки совпадают с прямым подсчетом
+    for lo in range(len(snapshot) + 1):
+        for hi in range(lo, len(snapshot) + 1):
+            assert (snapshot.window_counts(lo, hi, 1) == snapshot.frequency(1, slice(lo, hi))).all()
+
+    assert snapshot.window(last=2) == (1, 3)
+    seen = snapshot.last_seen(0, 3, field=1)
+    assert seen[0] == 1 and seen[1] == 2 and seen[19] == -1
+    assert snapshot.last_seen(0, 1, field=1)[8] == -1
+
+
+def test_cooccurrence_incremental(temp_db):
+    from src.analysis.bitmask import MaskIndex
+    from src.analysis.cooccurrence import CooccurrenceModel
+
+    store = DrawStore()
+    model = CooccurrenceModel()
+    publish_draw('10001', '08:00', [1, 2, 3, 4])
+    model.update(store.get())
+    publish_draw('10002', '12:00', [1, 2, 10, 11])
+    snapshot = store.get()
+    model.update(snapshot)
+
+    # Догрузка дает то же, что пересчет с нуля
+    full = MaskIndex(snapshot.masks.field_1, snapshot.masks.field_2)
+    assert (model.pairs['all'] == full.cooccurrence()).all()
+    assert (model.triples[1] == full.triples(1)).all()
+    assert model.top_pairs(1, 1) == [{'numbers': [1, 2], 'count': 2}]
+
+
+def test_restart_loads_snapshot_from_disk_cache(temp_db):
+    publish_draw('10001', '08:00', [1, 2, 3, 4])
+    DrawStore().get()
+
+    # Новый процесс: срез из кэша, затем обычная догрузка нового тиража
+    publish_draw('10002', '12:00', [1, 9, 10, 11])
+    store = DrawStore()
+    snapshot = store.get()
+    assert (store.full_loads, store.disk_loads, store.appends) == (0, 1, 1)
+    assert snapshot.draw_numbers.tolist() == ['10001', '10002']
+
+    with db.get_connection() as conn:
+        full = DrawStore()._full_load(conn, snapshot.db_path, snapshot.version, snapshot.rewritten)
+    assert (snapshot.cumulative[1] == full.cumulative[1]).all()
+    assert (snapshot.masks.field_2 == full.masks.field_2).all()
+
+
+def test_same_time_draw_with_longer_number_is_appended(temp_db):
+    store = DrawStore()
+    publish_draw('999', '10:00', [1, 2, 3, 4])
+    store.get()
+
+    # '1000' < '999' как текст, но это следующий тираж - догрузка, не перезагрузка
+    publish_draw('1000', '10:00', [1, 9, 10, 11])
+    snapshot = store.get()
+    assert (store.full_loads, store.appends) == (1, 1)
+    assert snapshot.draw_numbers.tolist() == ['999', '1000']
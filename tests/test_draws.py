@@ -0,0 +1,125 @@
+# test_draws.py - запись тиражей: агрегат number_stats и постраничная выдача
+from src.database import db
+from src.database.draws import fetch_draws_page
+from src.database.number_stats import read_number_stats, rebuild_number_stats
+from tests.conftest import add_draw
+
+
+def test_number_stats_incremental_matches_rebuild(temp_db):
+    with db.transaction() as conn:
+        add_draw(conn, '201', '2.1.2026', '10:00', [1, 2, 3, 4], [1, 6, 7, 8])
+        add_draw(conn, '202', '1.1.2026', '10:00', [1, 9, 10, 11], [5, 6, 7, 8])
+        # Перезапись тиража: число 2 уходит, 20 появляется
+        add_draw(conn, '201', '2.1.2026', '10:00', [1, 20, 3, 4], [1, 6, 7, 8])
+        incremental = read_number_stats(conn)
+
+        rebuild_number_stats(conn)
+        assert read_number_stats(conn) == incremental
+
+    assert 2 not in incremental
+    assert incremental[1]['count'] == 3
+    assert (incremental[1]['field_1'], incremental[1]['field_2']) == (2, 1)
+    assert incremental[1]['last_draw'] == '201'
+    assert incremental[9]['last_draw'] == '202'
+
+
+def test_keyset_pages_cover_all_draws(temp_db):
+    with db.transaction() as conn:
+        # Два тиража в одну минуту - порядок добивается draw_number
+        for number, date, time in [('101', '1.1.2026', '10:00'), ('102', '1.1.2026', '12:00'),
+                                   ('103', '1.1.2026', '12:00'), ('104', '2.1.2026', '10:00'),
+                                   ('105', '10.1.2026', '09:00')]:
+            add_draw(conn, number, date, time)
+
+    seen = []
+    cursor = None
+    with db.get_connection() as conn:
+        while True:
+            page, cursor = fetch_draws_page(conn, 2, cursor, ['tirage', 'field_1'])
+            seen.extend(item['tirage'] for item in page)
+            if cursor is None:
+                break
+
+    assert seen == ['105', '104', '103', '102', '101']
+    assert page[-1] == {'tirage': '101', 'field_1': [1, 2, 3, 4]}
+
+
+def test_same_time_draws_are_ordered_by_numeric_draw_number(temp_db):
+    # Номер - TEXT: при текстовом сравнении '9' оказался бы новее '10'
+    with db.transaction() as conn:
+        for number in ['9', '10', '11']:
+            add_draw(conn, number, '1.1.2026', '10:00')
+        assert read_number_stats(conn)[1]['last_draw'] == '11'
+        rebuild_number_stats(conn)
+        assert read_number_stats(conn)[1]['last_draw'] == '11'
+
+        page, cursor = fetch_draws_page(conn, 2, fields=['tirage'])
+        assert [item['tirage'] for item in page] == ['11', '10']
+        rest, _ = fetch_draws_page(conn, 2, cursor, ['tirage'])
+        assert [item['tirage'] for item in rest] == ['9']
+
+        plan = ' '.join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT draw_number FROM lottery_results WHERE draw_ts IS NOT NULL "
+            "ORDER BY draw_ts DESC, CAST(draw_number AS INTEGER) DESC LIMIT 3"))
+        assert 'idx_lottery_results_draw_order' in plan and 'TEMP B-TREE' not in plan
+
+
+def test_row_counters_follow_inserts_only(temp_db):
+    from src.database.meta import DRAW_COUNT, get_counter
+
+    with db.transaction() as conn:
+        add_draw(conn, '301', '1.1.2026', '10:00')
+        add_draw(conn, '302', '1.1.2026', '12:00')
+        # Перезапись существующего тиража (UPSERT) строк не добавляет
+        add_draw(conn, '301', '1.1.2026', '10:00', [9, 10, 11, 12])
+        assert get_counter(conn, DRAW_COUNT) == 2
+
+        conn.execute("DELETE FROM lottery_results WHERE draw_number = '302'")
+        assert get_counter(conn, DRAW_COUNT) == conn.execute("SELECT COUNT(*) FROM lottery_results").fetchone()[0]
+
+
+def test_failed_draw_is_rolled_back_alone(temp_db, monkeypatch):
+    from src.database import draws
+    from src.parsers.lottery_parser import CorrectLotteryParser
+
+    apply_draw = draws.apply_draw
+
+    def failing_apply(conn, draw_number, *args):
+        if draw_number == '402':
+            raise RuntimeError('boom')
+        return apply_draw(conn, draw_number, *args)
+
+    monkeypatch.setattr(draws, 'apply_draw', failing_apply)
+    items = [{'draw_number': number, 'date': '1.1.2026', 'time': time,
+              'field_1': '[1, 2, 3, 4]', 'field_2': '[5, 6, 7, 8]', 'created_at': '2026-01-01 00:00:00'}
+             for number, time in [('401', '10:00'), ('402', '12:00')]]
+    assert CorrectLotteryParser()._save_to_db(items) == 1
+
+    # Тираж с ошибкой после UPSERT не оставил ни строки, ни номеров
+    with db.get_connection() as conn:
+        assert [row[0] for row in conn.execute("SELECT draw_number FROM lottery_results")] == ['401']
+        assert conn.execute("SELECT COUNT(*) FROM draw_numbers").fetchone()[0] == 8
+        assert read_number_stats(conn)[1]['count'] == 1
+
+
+def test_rescrape_without_changes_keeps_data_version(temp_db):
+    from src.database.meta import get_data_version
+    from src.parsers.lottery_parser import CorrectLotteryParser
+
+    items = [{'draw_number': number, 'date': '1.1.2026', 'time': time,
+              'field_1': '[1, 2, 3, 4]', 'field_2': '[5, 6, 7, 8]', 'created_at': '2026-01-01 00:00:00'}
+             for number, time in [('501', '10:00'), ('502', '12:00')]]
+    parser = CorrectLotteryParser()
+    assert parser._save_to_db(items) == 2
+    with db.get_connection() as conn:
+        version = get_data_version(conn)
+
+    # Та же страница еще раз - ничего не записано, кэши не сбрасываются
+    assert parser._save_to_db(items) == 0
+    with db.get_connection() as conn:
+        assert get_data_version(conn) == version
+
+    items[1] = dict(items[1], field_2='[5, 6, 7, 9]')
+    assert parser._save_to_db(items) == 1
+    with db.get_connection() as conn:
+        assert get_data_version(conn) == version + 1
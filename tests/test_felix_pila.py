@@ -0,0 +1,101 @@
+# test_felix_pila.py - тензор FelixPilaAnalyzer и его догрузка
+from src.analyzers import felix_pila
+from src.analyzers.felix_pila import FelixPilaAnalyzer, FelixPilaModel
+from src.database import db
+from src.database.attribution import attribute_weather
+from tests.conftest import add_draw, add_weather
+
+
+def full_counts():
+    model = FelixPilaModel()
+    with db.get_connection() as conn:
+        model.apply_rows(conn.execute(felix_pila._ROWS_SQL).fetchall())
+    return model.counts
+
+
+def test_incremental_model_matches_full_pass(temp_db):
+    with db.transaction() as conn:
+        add_draw(conn, '10001', time='10:00', field_1=[1, 2, 3, 4], field_2=[1, 5, 6, 7])
+        add_weather(conn, '2026-01-02T10:00:00', -5.0, 'небольшой снег')
+    attribute_weather(tolerance_min=60)
+
+    analysis = FelixPilaAnalyzer().analyze_weather_correlation()
+    cell = analysis['снег_холодно_нормальное']
+    # Число 1 в обоих полях тиража считается один раз
+    assert cell['numbers'][1]['count'] == 1
+    assert cell['total_draws'] == 7
+
+    with db.transaction() as conn:
+        add_draw(conn, '10002', time='16:00', field_1=[1, 9, 10, 11], field_2=[2, 3, 4, 5])
+        add_weather(conn, '2026-01-02T16:00:00', 2.0, 'ясно')
+    attribute_weather(tolerance_min=60)
+
+    # Перепривязка всей истории с другим допуском
+    attribute_weather(only_missing=False, tolerance_min=0)
+    assert (felix_pila.get_model().counts == full_counts()).all()
+
+    prediction = FelixPilaAnalyzer().predict_numbers('ясно', 2.0, 750)
+    assert {number for number, _ in prediction} == {1, 2, 3, 4, 5, 9, 10, 11}
+    model = felix_pila.get_model()
+    assert felix_pila.FelixPilaModel.load(model.db_path, model.version).version == model.version
+
+
+def baseline_analysis(conn):
+    """Исходный анализатор: запрос по каждому числу и категоризация в цикле"""
+    analyzer = FelixPilaAnalyzer()
+    results = {}
+    for number in range(1, 21):
+        for temp, weather, pressure in conn.execute('''
+            SELECT temperature, weather, pressure FROM lottery_results
+            WHERE id IN (SELECT draw_id FROM draw_numbers WHERE number = ?)
+              AND temperature IS NOT NULL AND weather IS NOT NULL
+        ''', (number,)):
+            key = '_'.join([analyzer._categorize_weather(weather),
+                            analyzer._categorize_temperature(temp),
+                            analyzer._categorize_pressure(pressure)])
+            cell = results.setdefault(key, {'numbers': {n: 0 for n in range(1, 21)}, 'total_draws': 0})
+            cell['numbers'][number] += 1
+            cell['total_draws'] += 1
+    for cell in results.values():
+        cell['numbers'] = {n: {'count': c, 'probability': round(c / cell['total_draws'] * 100, 2)}
+                           for n, c in cell['numbers'].items()}
+    return results
+
+
+def baseline_predict(analysis, weather, temp, pressure):
+    """Исходный predict_numbers: узкие категории текущей погоды"""
+    analyzer = FelixPilaAnalyzer()
+    key = '_'.join([analyzer._categorize_weather(weather, {'ясно': ['ясно'], 'пасмурно': ['пасмурно']}),
+                    analyzer._categorize_temperature(temp, [('холодно', -10, 0), ('прохладно', 0, 10)]),
+                    analyzer._categorize_pressure(pressure, [('нормальное', 740, 760)])])
+    if key not in analysis:
+        return [(12, 8.65), (16, 8.65), (1, 7.69), (13, 7.69)]
+    numbers = [(n, data['probability']) for n, data in analysis[key]['numbers'].items()]
+    return sorted(numbers, key=lambda x: x[1], reverse=True)[:8]
+
+
+def test_same_output_as_baseline_analyzer(temp_db):
+    draws = [
+        ('1', [1, 2, 3, 4], [1, 5, 6, 7], 'ясно', -5.0, 750),
+        ('2', [8, 9, 10, 11], [2, 3, 4, 5], 'туман', 5.0, 750),
+        ('3', [1, 9, 12, 13], [14, 15, 16, 17], 'туман', -3.0, 745),
+        ('4', [18, 19, 20, 1], [2, 3, 4, 5], 'пасмурно', 55.0, 1005),
+        ('5', [5, 6, 7, 8], [9, 10, 11, 12], 'небольшой снег', -5.0, 750),
+        ('6', [2, 4, 6, 8], [1, 3, 5, 7], 'солнечно', 5.0, 752),
+    ]
+    with db.transaction() as conn:
+        for number, field_1, field_2, weather, temperature, pressure in draws:
+            draw_id, _ = add_draw(conn, number, time=f'1{number}:00', field_1=field_1, field_2=field_2)
+            conn.execute("UPDATE lottery_results SET weather = ?, temperature = ?, pressure = ? WHERE id = ?",
+                         (weather, temperature, pressure, draw_id))
+
+    with db.get_connection() as conn:
+        expected = baseline_analysis(conn)
+    analysis = FelixPilaAnalyzer().analyze_weather_correlation()
+    assert {key: (cell['numbers'], cell['total_draws']) for key, cell in analysis.items()} == \
+        {key: (cell['numbers'], cell['total_draws']) for key, cell in expected.items()}
+
+    # "солнечно" и "снег" исходный прогноз относил к "другое", 55° и 1005 мм - к "неизвестно"
+    for current in [('ясно', -5.0, 750), ('солнечно', 5.0, 750), ('снег', -3.0, 750),
+                    ('пасмурно', 15.0, 1005), ('дождь', 20.0, 750)]:
+        assert FelixPilaAnalyzer().predict_numbers(*current) == baseline_predict(expected, *current)
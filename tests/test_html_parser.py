@@ -0,0 +1,40 @@
+# test_html_parser.py - HTTP-парсер архива на сохраненных страницах lotonews.ru
+import json
+import os
+
+from config import Config
+from src.parsers import html_parser, lottery_parser
+from src.parsers.html_parser import extract_draws
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_extract_draws_from_server_rendered_table():
+    draws = extract_draws(read_fixture('lotonews_4x20_archive.html'))
+    assert len(draws) == 30
+    first = draws[0]
+    assert (first['draw_number'], first['date'], first['time']) == ('12332', '7.1.2026', '12:07')
+    # Цифры суперприза в соседней ячейке в комбинацию не попадают
+    assert (json.loads(first['field_1']), json.loads(first['field_2'])) == ([7, 11, 18, 20], [4, 14, 13, 18])
+    assert len({draw['draw_number'] for draw in draws}) == 30
+    assert extract_draws(read_fixture('lotonews_4x20_shell.html')) == []
+
+
+def test_http_backend_saves_or_falls_back_to_browser(temp_db, monkeypatch):
+    monkeypatch.setattr(Config, 'LOTTERY_PARSER_BACKEND', 'http')
+    browser_runs = []
+    monkeypatch.setattr(lottery_parser, 'run_browser_parser', lambda progress=None: browser_runs.append(1) or 0)
+
+    monkeypatch.setattr(html_parser, 'fetch_archive', lambda: read_fixture('lotonews_4x20_archive.html'))
+    assert lottery_parser.run_parser_sync() == 30
+    assert browser_runs == []
+
+    # Таблицу дорисовывает скрипт - нужен браузер
+    monkeypatch.setattr(html_parser, 'fetch_archive', lambda: read_fixture('lotonews_4x20_shell.html'))
+    assert lottery_parser.run_parser_sync() == 0
+    assert browser_runs == [1]
@@ -0,0 +1,93 @@
+# test_job_queue.py - очередь задач парсера: один поток и дедупликация
+import threading
+
+from src.parsers.job_queue import DONE, FAILED, ParserJobQueue
+
+
+def test_overlapping_requests_share_one_job():
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def runner(job):
+        runs.append(job.with_weather)
+        job.update('loading', 0.5)
+        started.set()
+        release.wait(5)
+        return 3
+
+    jobs = ParserJobQueue(runner)
+    first, created = jobs.submit('api')
+    assert created
+    started.wait(5)
+
+    # Пока задача идет, повторный клик и планировщик получают ее же
+    again, created = jobs.submit('scheduler', with_weather=True)
+    assert again is first and not created
+    assert jobs.get(first.id).to_dict()['stage'] == 'loading'
+
+    release.set()
+    jobs.join()
+    assert (first.status, first.saved_count, first.progress, first.requests) == (DONE, 3, 1.0, 2)
+    assert runs == [False]
+
+    # После завершения - новая задача; ошибка runner не останавливает поток
+    def failing(job):
+        raise RuntimeError('boom')
+    jobs.runner = failing
+    second, created = jobs.submit('api')
+    jobs.join()
+    assert created and second.status == FAILED and second.error == 'boom'
+    assert [job['job_id'] for job in jobs.recent()] == [second.id, first.id]
+
+
+def test_weather_requested_while_running_is_collected_once():
+    started = threading.Event()
+    release = threading.Event()
+    weather_runs = []
+    finished = []
+
+    def runner(job):
+        started.set()
+        release.wait(5)
+        return 1
+
+    jobs = ParserJobQueue(runner, weather_runner=weather_runs.append, on_finish=finished.append)
+    job, _ = jobs.submit('api')
+    started.wait(5)
+
+    # Планировщик с погодой пришел во время сбора - погода не теряется
+    jobs.submit('scheduler', with_weather=True)
+    jobs.submit('scheduler', with_weather=True)
+    release.set()
+    jobs.join()
+    assert job.status == DONE and job.with_weather and job.weather_done
+    assert weather_runs == [job] and finished == [job]
+
+    # Без запроса погоды этап пропускается, прогрев - после каждой задачи
+    second, _ = jobs.submit('api')
+    release.set()
+    jobs.join()
+    assert weather_runs == [job] and finished == [job, second]
+
+
+def test_request_after_scrape_gets_a_new_job():
+    finishing = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def on_finish(job):
+        finishing.set()
+        release.wait(5)
+
+    jobs = ParserJobQueue(lambda job: runs.append(job.id) or 0, on_finish=on_finish)
+    first, _ = jobs.submit('api')
+    finishing.wait(5)
+
+    # Сбор первой задачи закончен, она только прогревает кэши - запрос не теряется
+    second, created = jobs.submit('scheduler')
+    assert created and second is not first
+    release.set()
+    jobs.join()
+    assert runs == [first.id, second.id]
+    assert first.status == DONE and second.status == DONE
@@ -0,0 +1,90 @@
+# test_lottery_parser.py - загрузка архива: блокировка ресурсов и ожидание строк
+import asyncio
+
+from config import Config
+from src.parsers.lottery_parser import ROW_SELECTOR, ROWS_EXTRACT_SCRIPT, CorrectLotteryParser
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.result = None
+
+    async def abort(self):
+        self.result = 'abort'
+
+    async def continue_(self):
+        self.result = 'continue'
+
+
+class FakePage:
+    def __init__(self, rows, compact=None):
+        self.rows = rows
+        self.compact = compact
+        self.calls = []
+
+    async def route(self, pattern, handler):
+        self.calls.append(('route', pattern))
+        self.handler = handler
+
+    async def goto(self, url, wait_until, timeout):
+        self.calls.append(('goto', wait_until))
+
+    async def wait_for_selector(self, selector, timeout):
+        self.calls.append(('wait', selector))
+
+    async def evaluate(self, script, arg=None):
+        if script == ROWS_EXTRACT_SCRIPT:
+            return self.compact
+        return self.rows
+
+
+def test_scrape_blocks_assets_and_waits_for_rows(monkeypatch):
+    monkeypatch.setattr(Config, 'SCRAPER_EXTRACT_MODE', 'legacy')
+    row = {'draw_number': '12345', 'draw_date': '2.1.2026', 'draw_time': '22:00',
+           'field_1': [1, 2, 3, 4], 'field_2': [5, 6, 7, 8]}
+    page = FakePage([row, row])
+    parser = CorrectLotteryParser()
+
+    data = asyncio.run(parser.scrape(page))
+    assert page.calls == [('route', '**/*'), ('goto', 'domcontentloaded'), ('wait', ROW_SELECTOR)]
+    # Дубликаты строк отбрасываются
+    assert [(item['draw_number'], item['field_2']) for item in data] == [('12345', '[5, 6, 7, 8]')]
+
+    routes = [FakeRoute('https://www.lotonews.ru/draws/archive/4x20', 'document'),
+              FakeRoute('https://www.lotonews.ru/static/app.js', 'script'),
+              FakeRoute('https://www.lotonews.ru/img/logo.png', 'image'),
+              FakeRoute('https://mc.yandex.ru/metrika/tag.js', 'script')]
+    for route in routes:
+        asyncio.run(page.handler(route))
+    assert [route.result for route in routes] == ['continue', 'continue', 'abort', 'abort']
+    assert parser.blocked_requests == 2
+
+
+def test_rows_mode_reads_compact_arrays_and_falls_back_when_empty():
+    compact = {'draw_numbers': ['12332', '12331', '12332'],
+               'date_times': ['7.1.2026 12:07', '7.1.2026 10:00', '7.1.2026 12:07'],
+               'numbers': [7, 11, 18, 20, 4, 14, 13, 18,
+                           5, 14, 10, 17, 9, 16, 6, 3,
+                           7, 11, 18, 20, 4, 14, 13, 18],
+               'rows': 3, 'elements': 40}
+    parser = CorrectLotteryParser()
+    data = asyncio.run(parser._extract_correct_data(FakePage([], compact)))
+    # Повтор числа в поле 2 (18) допустим, дубликат строки - нет
+    assert [(item['draw_number'], item['time'], item['field_2']) for item in data] == [
+        ('12332', '12:07', '[4, 14, 13, 18]'), ('12331', '10:00', '[9, 16, 6, 3]')]
+    assert parser.extract_stats == {'mode': 'rows', 'elements': 40, 'rows': 3, 'draws': 2}
+
+    # Строк архива нет - прежний разбор страницы
+    row = {'draw_number': '12345', 'draw_date': '2.1.2026', 'draw_time': '22:00',
+           'field_1': [1, 2, 3, 4], 'field_2': [5, 6, 7, 8]}
+    empty = {'draw_numbers': [], 'date_times': [], 'numbers': [], 'rows': 0, 'elements': 0}
+    data = asyncio.run(parser._extract_correct_data(FakePage([row], empty)))
+    assert [item['draw_number'] for item in data] == ['12345']
+    assert parser.extract_stats['mode'] == 'legacy'
@@ -0,0 +1,50 @@
+# test_response_cache.py - кэш ответов: попадания, ETag и сброс по data_version
+import pytest
+from flask import Flask, jsonify
+
+from src.database import db
+from src.database.meta import bump_data_version
+from src.utils import response_cache
+from src.utils.response_cache import ResponseCache, cached_response
+
+
+@pytest.fixture
+def client(temp_db, monkeypatch):
+    monkeypatch.setattr(response_cache, '_cache', ResponseCache(max_entries=2))
+
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/stats')
+    @cached_response
+    def stats():
+        calls.append(1)
+        return jsonify({'success': True, 'calls': len(calls)})
+
+    return app.test_client(), calls
+
+
+def test_cached_until_data_version_changes(client):
+    client, calls = client
+
+    first = client.get('/stats?b=2&a=1')
+    # Порядок параметров не важен
+    assert client.get('/stats?a=1&b=2').get_json() == first.get_json()
+    assert client.get('/stats', headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+    assert client.get('/stats?a=1&b=2', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert len(calls) == 2
+
+    with db.transaction() as conn:
+        bump_data_version(conn)
+    assert client.get('/stats?a=1&b=2').get_json() == {'success': True, 'calls': 3}
+
+    stats = response_cache.get_response_cache().stats()
+    assert (stats['hits'], stats['misses'], stats['not_modified']) == (2, 3, 1)
+
+    # Перезапуск: кэш в памяти пуст, ответ читается с диска
+    response_cache._cache = ResponseCache(max_entries=2)
+    assert client.get('/stats?a=1&b=2').get_json() == {'success': True, 'calls': 3}
+    assert len(calls) == 3
+    # Запросы прогрева не считаются пользовательскими
+    client.get('/stats', headers={response_cache.WARM_UP_HEADER: '1'})
+    assert response_cache.get_response_cache().popular(1) == ['/stats?a=1&b=2']
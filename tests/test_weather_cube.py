@@ -0,0 +1,140 @@
+# test_weather_cube.py - погодный куб Felix Pila и его догрузка
+import numpy as np
+
+from src.analysis import weather_cube
+from src.analysis.weather_cube import WeatherCube, get_weather_cube, moon_phase_codes
+from src.database import db
+from src.database.draw_weather import refresh_draw_weather, refresh_draw_weather_for_ts
+from src.database.meta import bump_data_version
+from src.database.timestamps import parse_weather_ts
+from tests.conftest import add_draw, add_weather
+
+
+def test_cube_slices_and_incremental_update(temp_db, monkeypatch):
+    with db.transaction() as conn:
+        bump_data_version(conn)
+        for draw_number, date, field_1, field_2 in [('1', '2.1.2026', [1, 2, 3, 4], [1, 5, 6, 7]),
+                                                    ('2', '2.1.2026', [1, 9, 10, 11], [2, 3, 4, 5]),
+                                                    ('3', '5.1.2026', [8, 9, 10, 11], [12, 13, 14, 15])]:
+            add_draw(conn, draw_number, date, field_1=field_1, field_2=field_2)
+        add_weather(conn, '2026-01-02T10:00:00', -5.0, 'небольшой снег', humidity=80)
+        add_weather(conn, '2026-01-05T10:00:00', 2.0, 'ясно', humidity=40)
+        refresh_draw_weather(conn)
+
+    counts, draws = get_weather_cube().query({'weather': 'снег', 'temp_min': -5.0, 'temp_max': 0.0})
+    assert draws == 2
+    assert counts[0][0] == 2 and counts[1][0] == 1
+
+    _, draws = get_weather_cube().query({'humidity_min': 30, 'humidity_max': 50})
+    assert draws == 1
+    before = get_weather_cube()
+    before_counts, before_draws = before.query({})
+
+    # Новый замер меняет среднюю температуру суток 2 января: -5 и 3 -> -1
+    with db.transaction() as conn:
+        bump_data_version(conn)
+        add_weather(conn, '2026-01-02T18:00:00', 3.0, 'снег', humidity=80)
+        refresh_draw_weather_for_ts(conn, parse_weather_ts('2026-01-02T18:00:00'))
+
+    cube = get_weather_cube()
+    # Догрузка на копии: куб, уже выданный читателям, не меняется
+    assert cube is not before
+    assert np.array_equal(before.query({})[0], before_counts) and before.query({})[1] == before_draws
+    full = WeatherCube()
+    with db.get_connection() as conn:
+        full.apply_rows(conn.execute(weather_cube._ROWS_SQL, (-1,)).fetchall())
+    for filters in [{}, {'temp_min': -5.0, 'temp_max': -5.0}, {'temp_min': -1.0, 'temp_max': 0.0}]:
+        assert np.array_equal(cube.query(filters)[0], full.query(filters)[0])
+        assert cube.query(filters)[1] == full.query(filters)[1]
+    assert cube.query({'temp_min': -1.0, 'temp_max': -1.0})[1] == 2
+    assert WeatherCube.load(cube.db_path, cube.version).version == cube.version
+    # Куб прежней версии из дискового кэша удален
+    assert WeatherCube.load(cube.db_path, before.version) is None
+
+    # Куб новее данных (БД заменили) не используется, а строится заново
+    version, total = cube.version, cube.total_draws
+    weather_cube._cube.version += 5
+    rebuilt = get_weather_cube()
+    assert rebuilt.version == version and rebuilt.total_draws == total
+
+    # Актуальный куб отдается без блокировки, которую держит загрузка
+    class HeldLock:
+        def __enter__(self):
+            raise AssertionError('читатель ждет блокировку')
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(weather_cube, '_cube_lock', HeldLock())
+    assert get_weather_cube() is rebuilt
+
+    # Полнолуние 3 января 2026, новолуние 18 января 2026
+    assert list(moon_phase_codes([parse_weather_ts('2026-01-03T12:00:00'),
+                                  parse_weather_ts('2026-01-18T12:00:00')])) == [2, 0]
+
+
+def test_query_many_and_facets_match_single_queries(temp_db):
+    with db.transaction() as conn:
+        bump_data_version(conn)
+        for draw_number, date in [('1', '2.1.2026'), ('2', '3.1.2026'), ('3', '5.1.2026')]:
+            add_draw(conn, draw_number, date, field_1=[1, 2, 3, int(draw_number) + 10], field_2=[4, 5, 6, 7])
+        add_weather(conn, '2026-01-02T10:00:00', -5.0, 'снег')
+        add_weather(conn, '2026-01-03T10:00:00', -2.0, 'снег')
+        add_weather(conn, '2026-01-05T10:00:00', 2.0, 'ясно')
+        refresh_draw_weather(conn)
+
+    cube = get_weather_cube()
+    filter_sets = [{}, {'weather': 'снег'}, {'weather': 'снег', 'temp_min': -5.0, 'temp_max': -3.0},
+                   {'moon_phase': 'full'}, {'temp_min': 40.0, 'temp_max': 45.0}]
+    counts, draws = cube.query_many(filter_sets)
+    for i, filters in enumerate(filter_sets):
+        single_counts, single_draws = cube.query(filters)
+        assert np.array_equal(counts[i], single_counts)
+        assert draws[i] == single_draws
+    assert list(draws) == [3, 2, 1, 2, 0]
+    # Фасет значения = число тиражей, если выбрать это значение при остальных фильтрах
+    total, facets = cube.facets({'weather': 'снег', 'temp_min': -5.0, 'temp_max': 0.0})
+    assert total == 2
+    assert (facets['temp']['-10_-5'], facets['temp']['-5_0'], facets['temp']['0_5']) == (1, 2, 0)
+    assert facets['weather'] == {'снег': 2, 'ясно': 0}
+    assert facets['moon']['full'] == cube.query({'weather': 'снег', 'temp_min': -5.0, 'temp_max': 0.0,
+                                                 'moon_phase': 'full'})[1]
+
+
+def test_latest_window_counts_newest_matching_draws(temp_db):
+    with db.transaction() as conn:
+        bump_data_version(conn)
+        # Тиражи 9 и 10 в одно время: новее 10 (номер сравнивается числом)
+        for draw_number, date, last in [('1', '2.1.2026', 11), ('9', '3.1.2026', 19), ('10', '3.1.2026', 20)]:
+            add_draw(conn, draw_number, date, field_1=[1, 2, 3, last])
+        add_weather(conn, '2026-01-02T10:00:00', -5.0, 'снег')
+        add_weather(conn, '2026-01-03T10:00:00', -2.0, 'снег')
+        refresh_draw_weather(conn)
+
+    cube = get_weather_cube()
+    counts, draws = cube.query({'weather': 'снег'}, latest=1)
+    assert draws == 1 and counts[0][19] == 1 and counts[0][18] == 0
+    counts, draws = cube.query({'weather': 'снег'}, latest=2)
+    assert draws == 2 and counts[0][10] == 0 and counts[0][0] == 2
+    # Окно шире выборки - все подходящие тиражи, как без окна
+    assert np.array_equal(cube.query({}, latest=100)[0], cube.query({})[0])
+
+    filter_sets = [{}, {'temp_min': -5.0, 'temp_max': -5.0}]
+    many_counts, many_draws = cube.query_many(filter_sets, latest=2)
+    for i, filters in enumerate(filter_sets):
+        assert np.array_equal(many_counts[i], cube.query(filters, latest=2)[0])
+        assert many_draws[i] == cube.query(filters, latest=2)[1]
+
+
+def test_draw_weather_uses_offset_of_draw_date_and_rounds_half_up(temp_db):
+    # Летом 2010 года в Москве было UTC+4: тираж в 00:30 - уже 15 июля
+    with db.transaction() as conn:
+        draw_id, _ = add_draw(conn, '1', '15.7.2010', '00:30')
+        add_weather(conn, '2010-07-14T23:50:00', -20.0)
+        add_weather(conn, '2010-07-15T00:10:00', 2.0)
+        add_weather(conn, '2010-07-15T12:00:00', 3.0)
+        refresh_draw_weather(conn)
+        row = conn.execute("SELECT temperature, observations FROM draw_weather WHERE draw_id = ?",
+                           (draw_id,)).fetchone()
+    # Среднее 2.5 округляется как ROUND() в SQL, а не к четному
+    assert (row['temperature'], row['observations']) == (3, 2)